@@ -88,6 +88,10 @@ setup(
     platforms=['Posix'],
     cmdclass={'test': PyTest, 'lint': PyLint},
     tests_require=['pytest', 'pytest-cov'],
+    extras_require={
+        'numpy': ['numpy'],
+        'pandas': ['pandas'],
+    },
     classifiers=[
         'Development Status :: 3 - Alpha',
         'Environment :: Console',
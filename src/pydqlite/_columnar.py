@@ -0,0 +1,337 @@
+"""
+Binary columnar result format and parameter encoding shared with libdqlite.
+
+All integers are little-endian.  A result is laid out as::
+
+    magic     b'DQC1'
+    u32       number of columns
+    u64       number of rows
+    per column:
+        u32 + utf-8   column name
+        u32 + utf-8   declared type
+    per column:
+        u8            encoding
+        ...           encoding specific body
+
+Every encoding but ENCODING_TAGGED starts its body with a u8 flag which,
+when set, is followed by a null bitmap of ceil(rows / 8) bytes (bit i set
+means row i is NULL).  Bodies are then:
+
+    ENCODING_INTEGER  rows x i64
+    ENCODING_FLOAT    rows x f64
+    ENCODING_TEXT     rows x u32 byte lengths, then the utf-8 bytes
+    ENCODING_BLOB     rows x u32 byte lengths, then the raw bytes
+    ENCODING_TAGGED   rows x (u8 tag, tag specific payload) for columns
+                      holding values of several storage classes, where the
+                      tag is one of the TAG_* constants and payloads follow
+                      the encodings above.
+
+NULL slots of dense columns are zero filled (zero length for TEXT/BLOB).
+
+Statement parameters are sent in the same vocabulary: a u32 count followed
+by one (u8 tag, payload) entry per parameter, as in ENCODING_TAGGED.  A
+batch of parameter sets is a u32 count followed by that many sets.
+"""
+
+from __future__ import unicode_literals
+
+import array
+import itertools
+import struct
+import sys
+
+from .exceptions import InterfaceError
+
+MAGIC = b'DQC1'
+
+ENCODING_TAGGED = 0
+ENCODING_INTEGER = 1
+ENCODING_FLOAT = 2
+ENCODING_TEXT = 3
+ENCODING_BLOB = 4
+
+TAG_NULL = 0
+TAG_INTEGER = 1
+TAG_FLOAT = 2
+TAG_TEXT = 3
+TAG_BLOB = 4
+
+_header = struct.Struct('<4sIQ')
+_u8 = struct.Struct('<B')
+_u32 = struct.Struct('<I')
+_i64 = struct.Struct('<q')
+_f64 = struct.Struct('<d')
+
+_tagged_integer = struct.Struct('<Bq')
+_tagged_float = struct.Struct('<Bd')
+_tagged_sized = struct.Struct('<BI')
+
+_swap = sys.byteorder != 'little'
+
+
+def _read_str(buf, offset):
+    size, = _u32.unpack_from(buf, offset)
+    offset += 4
+    return str(buf[offset:offset + size], 'utf-8'), offset + size
+
+
+def _read_array(typecode, buf, offset, count):
+    values = array.array(typecode)
+    end = offset + count * values.itemsize
+    values.frombytes(buf[offset:end])
+    if _swap:
+        values.byteswap()
+    return values, end
+
+
+def _read_nulls(buf, offset, nrows):
+    has_nulls, = _u8.unpack_from(buf, offset)
+    offset += 1
+    if not has_nulls:
+        return None, offset
+    end = offset + (nrows + 7) // 8
+    bitmap = bytes(buf[offset:end])
+    return [i for i in range(nrows) if bitmap[i >> 3] & (1 << (i & 7))], end
+
+
+def _read_sized(buf, offset, nrows, text):
+    lengths, offset = _read_array('I', buf, offset, nrows)
+    values = []
+    append = values.append
+    for size in lengths:
+        end = offset + size
+        append(str(buf[offset:end], 'utf-8') if text else bytes(buf[offset:end]))
+        offset = end
+    return values, offset
+
+
+def _read_tagged(buf, offset, nrows):
+    values = []
+    append = values.append
+    for _ in range(nrows):
+        tag = buf[offset]
+        offset += 1
+        if tag == TAG_NULL:
+            append(None)
+        elif tag == TAG_INTEGER:
+            append(_i64.unpack_from(buf, offset)[0])
+            offset += 8
+        elif tag == TAG_FLOAT:
+            append(_f64.unpack_from(buf, offset)[0])
+            offset += 8
+        elif tag in (TAG_TEXT, TAG_BLOB):
+            size, = _u32.unpack_from(buf, offset)
+            offset += 4
+            chunk = buf[offset:offset + size]
+            append(str(chunk, 'utf-8') if tag == TAG_TEXT else bytes(chunk))
+            offset += size
+        else:
+            raise InterfaceError('unknown value tag {} in columnar result'.format(tag))
+    return values, offset
+
+
+def _read_column(buf, offset, nrows, arrays):
+    encoding, = _u8.unpack_from(buf, offset)
+    offset += 1
+    if encoding == ENCODING_TAGGED:
+        return _read_tagged(buf, offset, nrows)
+
+    nulls, offset = _read_nulls(buf, offset, nrows)
+    if encoding in (ENCODING_INTEGER, ENCODING_FLOAT):
+        values, offset = _read_array(
+            'q' if encoding == ENCODING_INTEGER else 'd', buf, offset, nrows)
+        if not (arrays and nulls is None):
+            values = values.tolist()
+    elif encoding in (ENCODING_TEXT, ENCODING_BLOB):
+        values, offset = _read_sized(buf, offset, nrows, encoding == ENCODING_TEXT)
+    else:
+        raise InterfaceError('unknown column encoding {} in columnar result'.format(encoding))
+
+    if nulls:
+        for i in nulls:
+            values[i] = None
+    return values, offset
+
+
+def decode(buf, arrays=False):
+    """
+    Decode a columnar result held in any bytes-like object.
+
+    Returns ``(column_info, columns)``: a list of ``(name, decltype)`` pairs
+    and one list of Python values per column.  With ``arrays``, integer and
+    float columns without NULLs are returned as array.array('q') and
+    array.array('d') instead of lists.
+    """
+    buf = memoryview(buf).cast('B') if not isinstance(buf, bytes) else buf
+    magic, ncols, nrows = _header.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise InterfaceError('not a columnar result: bad magic {!r}'.format(magic))
+    offset = _header.size
+
+    column_info = []
+    for _ in range(ncols):
+        name, offset = _read_str(buf, offset)
+        decltype, offset = _read_str(buf, offset)
+        column_info.append((name, decltype))
+
+    columns = []
+    for _ in range(ncols):
+        values, offset = _read_column(buf, offset, nrows, arrays)
+        columns.append(values)
+    return column_info, columns
+
+
+def encode_params(values):
+    """Encode adapted statement parameters for the native binding calls."""
+    out = [_u32.pack(len(values))]
+    append = out.append
+    for i, value in enumerate(values):
+        if value is None:
+            append(_u8.pack(TAG_NULL))
+        elif isinstance(value, int):
+            try:
+                append(_tagged_integer.pack(TAG_INTEGER, value))
+            except struct.error:
+                raise OverflowError('Python int too large to convert to SQLite INTEGER')
+        elif isinstance(value, float):
+            append(_tagged_float.pack(TAG_FLOAT, value))
+        elif isinstance(value, str):
+            data = value.encode('utf-8')
+            append(_tagged_sized.pack(TAG_TEXT, len(data)))
+            append(data)
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            data = bytes(value)
+            append(_tagged_sized.pack(TAG_BLOB, len(data)))
+            append(data)
+        else:
+            raise InterfaceError(
+                'Error binding parameter {} - probably unsupported type.'.format(i))
+    return b''.join(out)
+
+
+def encode_batch(param_sets):
+    """Concatenate parameter sets produced by encode_params into a batch."""
+    return _u32.pack(len(param_sets)) + b''.join(param_sets)
+
+
+class LazyColumn(object):
+    """
+    One column of a columnar result whose values are decoded, and passed
+    to ``converter`` unless NULL, only when asked for.
+
+    Locating the column costs a pass over its lengths (TEXT, BLOB) or
+    tags (mixed columns); fixed-width values are read straight from their
+    position in the buffer.
+    """
+
+    __slots__ = ('_buf', '_start', '_nrows', '_encoding', '_bitmap', '_data',
+                 '_lengths', '_positions', 'converter')
+
+    def __init__(self, buf, start, nrows):
+        self._buf = buf
+        self._start = start
+        self._nrows = nrows
+        self._bitmap = None
+        self._lengths = None
+        self._positions = None
+        self.converter = None
+
+    def _locate(self):
+        """Parse the column header and return the offset of the next column."""
+        buf = self._buf
+        nrows = self._nrows
+        encoding = self._encoding = buf[self._start]
+        offset = self._start + 1
+        if encoding == ENCODING_TAGGED:
+            positions = self._positions = array.array('Q', bytes(8 * nrows))
+            for i in range(nrows):
+                positions[i] = offset
+                tag = buf[offset]
+                offset += 1
+                if tag in (TAG_INTEGER, TAG_FLOAT):
+                    offset += 8
+                elif tag in (TAG_TEXT, TAG_BLOB):
+                    offset += 4 + _u32.unpack_from(buf, offset)[0]
+                elif tag != TAG_NULL:
+                    raise InterfaceError('unknown value tag {} in columnar result'.format(tag))
+            return offset
+
+        has_nulls = buf[offset]
+        offset += 1
+        if has_nulls:
+            end = offset + (nrows + 7) // 8
+            self._bitmap = buf[offset:end]
+            offset = end
+        if encoding in (ENCODING_INTEGER, ENCODING_FLOAT):
+            self._data = offset
+            return offset + 8 * nrows
+        if encoding in (ENCODING_TEXT, ENCODING_BLOB):
+            self._lengths, offset = _read_array('I', buf, offset, nrows)
+            self._data = offset
+            return offset + sum(self._lengths)
+        raise InterfaceError('unknown column encoding {} in columnar result'.format(encoding))
+
+    def __len__(self):
+        return self._nrows
+
+    def value(self, i):
+        """Return the (converted) value of row ``i``."""
+        if not 0 <= i < self._nrows:
+            raise IndexError('row index out of range')
+        buf = self._buf
+        encoding = self._encoding
+        if encoding == ENCODING_TAGGED:
+            value, _ = _read_tagged(buf, self._positions[i], 1)
+            value = value[0]
+        elif self._bitmap is not None and self._bitmap[i >> 3] & (1 << (i & 7)):
+            return None
+        elif encoding == ENCODING_INTEGER:
+            value = _i64.unpack_from(buf, self._data + 8 * i)[0]
+        elif encoding == ENCODING_FLOAT:
+            value = _f64.unpack_from(buf, self._data + 8 * i)[0]
+        else:
+            if self._positions is None:
+                # Not accumulate(initial=), which needs Python 3.8.
+                self._positions = array.array('Q', itertools.accumulate(
+                    itertools.chain((self._data,), self._lengths)))
+            start = self._positions[i]
+            chunk = buf[start:start + self._lengths[i]]
+            value = str(chunk, 'utf-8') if encoding == ENCODING_TEXT else bytes(chunk)
+        if value is None or self.converter is None:
+            return value
+        return self.converter(value)
+
+    def values(self):
+        """Decode and convert the whole column at once."""
+        values, _ = _read_column(self._buf, self._start, self._nrows, True)
+        converter = self.converter
+        if converter is not None:
+            values = [None if value is None else converter(value) for value in values]
+        return values
+
+
+def decode_lazy(buf):
+    """
+    Like decode(), but return one LazyColumn per column instead of lists,
+    leaving values undecoded.  ``buf`` must outlive the columns, so it is
+    copied unless it already is bytes.
+    """
+    if not isinstance(buf, bytes):
+        buf = bytes(buf)
+    magic, ncols, nrows = _header.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise InterfaceError('not a columnar result: bad magic {!r}'.format(magic))
+    offset = _header.size
+
+    column_info = []
+    for _ in range(ncols):
+        name, offset = _read_str(buf, offset)
+        decltype, offset = _read_str(buf, offset)
+        column_info.append((name, decltype))
+
+    columns = []
+    for _ in range(ncols):
+        column = LazyColumn(buf, offset, nrows)
+        offset = column._locate()
+        columns.append(column)
+    return column_info, columns
@@ -0,0 +1,82 @@
+"""
+Decoding of JSON query results.
+
+A JSON result is an object with a ``columns`` list of ``{"name", "type"}``
+objects and a ``rows`` list of value lists.  It is parsed with orjson or
+ujson when one is installed, with the standard library otherwise, or with
+whatever function was passed to register_json_loads().
+"""
+
+from __future__ import unicode_literals
+
+import json
+
+from .exceptions import InterfaceError
+
+
+def _default_loads():
+    # Imported on first use rather than with the module, so importing
+    # pydqlite does not pay for a JSON library it may never need.
+    try:
+        import orjson
+    except ImportError:
+        pass
+    else:
+        # orjson reads bytes-like objects, native buffers included, without
+        # copying them first.
+        return orjson.loads, True
+    try:
+        import ujson
+    except ImportError:
+        return json.loads, False
+    return ujson.loads, False
+
+
+# Resolved by the first decode() call unless registered before.
+_loads = None
+_reads_buffers = False
+
+
+def register_json_loads(loads, reads_buffers=False):
+    """Parse JSON results with ``loads`` instead, or with the default
+    again if it is None.  Unless ``reads_buffers`` is set, ``loads`` is
+    given bytes rather than a memoryview."""
+    global _loads, _reads_buffers
+    _loads, _reads_buffers = loads, reads_buffers
+
+
+def decode(buf, plan=None):
+    """
+    Decode a JSON result held in a bytes-like object or a str.
+
+    Returns ``(description, rows)`` with one tuple per row.  ``plan``, if
+    given, is called with the description and returns ``(index, func)``
+    pairs; func is applied to every non-NULL value of that column while
+    the rows are built.
+    """
+    global _loads, _reads_buffers
+    if _loads is None:
+        _loads, _reads_buffers = _default_loads()
+    if isinstance(buf, memoryview) and not _reads_buffers:
+        buf = buf.tobytes()
+    try:
+        result = _loads(buf)
+    except ValueError as e:
+        raise InterfaceError('invalid JSON result: {}'.format(e))
+
+    description = [(column.get('name'), None, None, None, None, None, None,
+                    column.get('type')) for column in result.get('columns') or ()]
+    rows = result.get('rows') or ()
+    conversions = plan(description) if plan is not None and rows else None
+    if not conversions:
+        return description, list(map(tuple, rows))
+
+    converted = []
+    append = converted.append
+    for row in rows:
+        for i, func in conversions:
+            value = row[i]
+            if value is not None:
+                row[i] = func(value)
+        append(tuple(row))
+    return description, converted
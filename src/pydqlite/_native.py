@@ -0,0 +1,176 @@
+"""
+Process-wide binding of libdqlite.
+
+The shared library is located, loaded and its prototypes declared once,
+the first time a connection needs it, and then shared by every
+connection in the process.
+"""
+
+from __future__ import unicode_literals
+
+import ctypes
+import os
+import threading
+
+_LIBRARY_NAME = 'libdqlite.so'
+
+_lock = threading.Lock()
+_library = None
+
+
+def _library_path():
+    # 获取 libdqlite.so 的路径
+    try:
+        from importlib.resources import files
+    except ImportError:
+        return os.path.join(os.path.dirname(os.path.abspath(__file__)), _LIBRARY_NAME)
+    return str(files(__package__) / _LIBRARY_NAME)
+
+
+def _bind(libdqlite):
+    # 定义函数原型
+    # dqlite_connect returns an opaque session handle (NULL on failure);
+    # every other entry point takes that handle as its first argument so
+    # that each Connection owns an independent native session.
+    libdqlite.dqlite_connect.argtypes = [ctypes.c_char_p, ctypes.c_char_p]
+    libdqlite.dqlite_connect.restype = ctypes.c_void_p
+
+    # dqlite_query hands back a buffer owned by the library, plus its
+    # length, which must be released with dqlite_free.  A non-zero return
+    # code means the buffer holds an error message instead of a result.
+    libdqlite.dqlite_query.argtypes = [
+        ctypes.c_void_p, ctypes.c_char_p,
+        ctypes.POINTER(ctypes.c_void_p), ctypes.POINTER(ctypes.c_size_t)]
+    libdqlite.dqlite_query.restype = ctypes.c_int
+
+    libdqlite.dqlite_free.argtypes = [ctypes.c_void_p]
+    libdqlite.dqlite_free.restype = None
+
+    libdqlite.dqlite_disconnect.argtypes = [ctypes.c_void_p]
+    libdqlite.dqlite_disconnect.restype = None
+
+    # Optional: dqlite_connect giving up after timeout_ms milliseconds.
+    if hasattr(libdqlite, 'dqlite_connect_timeout'):
+        libdqlite.dqlite_connect_timeout.argtypes = [
+            ctypes.c_char_p, ctypes.c_char_p, ctypes.c_uint64]
+        libdqlite.dqlite_connect_timeout.restype = ctypes.c_void_p
+
+    # Optional: dqlite_set_timeout bounds every later statement of a session
+    # to timeout_ms milliseconds (0 for no limit); a statement running past
+    # it fails with DQLITE_TIMEOUT.  dqlite_interrupt aborts the statement
+    # running on a session, which fails with DQLITE_INTERRUPTED.  It may be
+    # called from any thread, concurrently with the statement, and ignores
+    # handles that have already been disconnected.
+    if hasattr(libdqlite, 'dqlite_set_timeout'):
+        libdqlite.dqlite_set_timeout.argtypes = [ctypes.c_void_p, ctypes.c_uint64]
+        libdqlite.dqlite_set_timeout.restype = ctypes.c_int
+
+    if hasattr(libdqlite, 'dqlite_interrupt'):
+        libdqlite.dqlite_interrupt.argtypes = [ctypes.c_void_p]
+        libdqlite.dqlite_interrupt.restype = None
+
+    # Optional: dqlite_leader writes the "host:port" address of the current
+    # leader (empty if unknown), dqlite_cluster a JSON array of the
+    # addresses of every known node.
+    for name in ('dqlite_leader', 'dqlite_cluster'):
+        if hasattr(libdqlite, name):
+            func = getattr(libdqlite, name)
+            func.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_void_p),
+                             ctypes.POINTER(ctypes.c_size_t)]
+            func.restype = ctypes.c_int
+
+    # Optional: selects the encoding of query results for one session and
+    # returns non-zero if the library does not support it.
+    if hasattr(libdqlite, 'dqlite_set_format'):
+        libdqlite.dqlite_set_format.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        libdqlite.dqlite_set_format.restype = ctypes.c_int
+
+    # Optional: server-side prepared statements.  dqlite_prepare stores a
+    # statement id, dqlite_query_stmt binds parameters encoded by
+    # _columnar.encode_params and runs it; both follow the dqlite_query
+    # convention for their trailing (void **out, size_t *out_len) pair.
+    if hasattr(libdqlite, 'dqlite_prepare'):
+        out_args = [ctypes.POINTER(ctypes.c_void_p), ctypes.POINTER(ctypes.c_size_t)]
+        libdqlite.dqlite_prepare.argtypes = [
+            ctypes.c_void_p, ctypes.c_char_p, ctypes.POINTER(ctypes.c_uint64)] + out_args
+        libdqlite.dqlite_prepare.restype = ctypes.c_int
+
+        libdqlite.dqlite_query_stmt.argtypes = [
+            ctypes.c_void_p, ctypes.c_uint64, ctypes.c_char_p, ctypes.c_size_t] + out_args
+        libdqlite.dqlite_query_stmt.restype = ctypes.c_int
+
+        libdqlite.dqlite_finalize.argtypes = [ctypes.c_void_p, ctypes.c_uint64]
+        libdqlite.dqlite_finalize.restype = None
+
+    # Optional: server-side cursors.  dqlite_rows_open runs a statement and
+    # stores a cursor id; each dqlite_rows_next call returns up to max_rows
+    # rows in the session's result format, an empty result once exhausted.
+    if hasattr(libdqlite, 'dqlite_rows_open'):
+        out_args = [ctypes.POINTER(ctypes.c_void_p), ctypes.POINTER(ctypes.c_size_t)]
+        libdqlite.dqlite_rows_open.argtypes = [
+            ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_size_t,
+            ctypes.POINTER(ctypes.c_uint64)] + out_args
+        libdqlite.dqlite_rows_open.restype = ctypes.c_int
+
+        libdqlite.dqlite_rows_next.argtypes = [
+            ctypes.c_void_p, ctypes.c_uint64, ctypes.c_int] + out_args
+        libdqlite.dqlite_rows_next.restype = ctypes.c_int
+
+        libdqlite.dqlite_rows_close.argtypes = [ctypes.c_void_p, ctypes.c_uint64]
+        libdqlite.dqlite_rows_close.restype = None
+
+    # Optional: runs one statement for every parameter set of a batch built
+    # by _columnar.encode_batch and stores the total number of rows changed.
+    # The library opens a transaction around the batch unless the session
+    # is already inside one.
+    if hasattr(libdqlite, 'dqlite_exec_batch'):
+        libdqlite.dqlite_exec_batch.argtypes = [
+            ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_size_t,
+            ctypes.POINTER(ctypes.c_uint64),
+            ctypes.POINTER(ctypes.c_void_p), ctypes.POINTER(ctypes.c_size_t)]
+        libdqlite.dqlite_exec_batch.restype = ctypes.c_int
+
+    # Optional: statements run for their effect.  dqlite_exec runs a
+    # statement with parameters encoded by _columnar.encode_params (none
+    # when params_len is 0) and stores the session's last inserted rowid
+    # and the number of rows the statement changed, instead of producing a
+    # result; dqlite_exec_stmt does the same for a prepared statement id.
+    # The buffer pair only carries an error message.
+    if hasattr(libdqlite, 'dqlite_exec'):
+        out_args = [ctypes.POINTER(ctypes.c_int64), ctypes.POINTER(ctypes.c_uint64),
+                    ctypes.POINTER(ctypes.c_void_p), ctypes.POINTER(ctypes.c_size_t)]
+        libdqlite.dqlite_exec.argtypes = [
+            ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_size_t] + out_args
+        libdqlite.dqlite_exec.restype = ctypes.c_int
+
+        if hasattr(libdqlite, 'dqlite_exec_stmt'):
+            libdqlite.dqlite_exec_stmt.argtypes = [
+                ctypes.c_void_p, ctypes.c_uint64, ctypes.c_char_p, ctypes.c_size_t] + out_args
+            libdqlite.dqlite_exec_stmt.restype = ctypes.c_int
+
+    # Optional: pipelining.  dqlite_submit sends a statement with its
+    # parameters without waiting for the result and stores a request id;
+    # dqlite_wait blocks until the result of that request is in and returns
+    # it like dqlite_query does.  Requests are answered in submission order
+    # and no other statement may run on the session while any is pending.
+    if hasattr(libdqlite, 'dqlite_submit'):
+        out_args = [ctypes.POINTER(ctypes.c_void_p), ctypes.POINTER(ctypes.c_size_t)]
+        libdqlite.dqlite_submit.argtypes = [
+            ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_size_t,
+            ctypes.POINTER(ctypes.c_uint64)] + out_args
+        libdqlite.dqlite_submit.restype = ctypes.c_int
+
+        libdqlite.dqlite_wait.argtypes = [ctypes.c_void_p, ctypes.c_uint64] + out_args
+        libdqlite.dqlite_wait.restype = ctypes.c_int
+    return libdqlite
+
+
+def load_library():
+    """Return the bound libdqlite, loading it on first use."""
+    global _library
+    if _library is None:
+        with _lock:
+            if _library is None:
+                # 加载 Go 共享库
+                _library = _bind(ctypes.CDLL(_library_path()))
+    return _library
@@ -0,0 +1,107 @@
+"""
+Conversion of result rows to NumPy arrays, one per column.
+
+NumPy is optional and only imported when an array is asked for.
+"""
+
+from __future__ import unicode_literals
+
+import array
+import datetime
+
+from . import extensions
+
+_DATETIME_TYPES = ('DATE', 'TIME', 'TIMESTAMP', 'DATETIME')
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('NumPy export requires numpy; install pydqlite[numpy]')
+    return numpy
+
+
+def _kind(decltype, values):
+    """Classify a column as 'int', 'float', 'datetime' or 'object', from
+    its declared type as SQLite's affinity rules would, or from its first
+    non-NULL value when it has none."""
+    decltype = (decltype or '').upper().partition('(')[0].strip()
+    if decltype in _DATETIME_TYPES:
+        return 'datetime'
+    if 'INT' in decltype:
+        return 'int'
+    if any(name in decltype for name in ('REAL', 'FLOA', 'DOUB')):
+        return 'float'
+    if decltype:
+        return 'object'
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            return 'object'
+        if isinstance(value, int):
+            return 'int'
+        if isinstance(value, float):
+            return 'float'
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            return 'datetime'
+        return 'object'
+    return 'object'
+
+
+def _datetime_value(value):
+    if value is None:
+        return None
+    if isinstance(value, (str, bytes)):
+        value = extensions._parse_timestamp(value)
+    if isinstance(value, datetime.datetime) and value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _column_array(numpy, kind, values, count):
+    if kind == 'int':
+        try:
+            return numpy.fromiter(values(), numpy.int64, count)
+        except (TypeError, ValueError, OverflowError):
+            # NULLs or stray values: try the float representation.
+            kind = 'float'
+    if kind == 'float':
+        nan = float('nan')
+        try:
+            return numpy.fromiter((nan if value is None else value for value in values()),
+                                  numpy.float64, count)
+        except (TypeError, ValueError):
+            kind = 'object'
+    if kind == 'datetime':
+        try:
+            return numpy.array([_datetime_value(value) for value in values()],
+                               dtype='datetime64[us]')
+        except (TypeError, ValueError):
+            kind = 'object'
+    column = numpy.empty(count, dtype=object)
+    column[:] = list(values())
+    return column
+
+
+def columns_to_arrays(description, columns):
+    """
+    Return one array per column of ``columns``, sequences of values in
+    description order: int64 for integer columns, float64 for real ones
+    and integer ones holding NULLs (as NaN), datetime64[us] for date and
+    time columns (NULL as NaT) and object for everything else.  Integer
+    and float array.array columns are wrapped without copying.
+    """
+    numpy = _numpy()
+    arrays = []
+    for column, values in zip(description, columns):
+        kind = _kind(column[7], values)
+        if isinstance(values, array.array) and \
+                (kind, values.typecode) in (('int', 'q'), ('float', 'd')):
+            arrays.append(numpy.frombuffer(
+                values, numpy.int64 if kind == 'int' else numpy.float64))
+            continue
+        arrays.append(_column_array(numpy, kind, lambda values=values: iter(values),
+                                    len(values)))
+    return arrays
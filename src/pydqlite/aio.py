@@ -0,0 +1,211 @@
+"""
+asyncio front end for pydqlite.
+
+Every call that may block on the native library is run in an executor, so
+awaiting a query never stalls the event loop.  Queries on separate
+AsyncConnection objects run concurrently; queries sharing one connection
+are serialized by that connection's lock.  Cancelling a task interrupts
+the statement it is waiting for, or drops it if it has not started yet.
+"""
+
+from __future__ import unicode_literals
+
+import asyncio
+import functools
+import threading
+
+from .connections import Connection
+from .cursors import Cursor
+
+
+class AsyncCursor(object):
+
+    def __init__(self, connection, cursor):
+        self._connection = connection
+        self._cursor = cursor
+
+    @property
+    def connection(self):
+        return self._connection
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def arraysize(self):
+        return self._cursor.arraysize
+
+    @arraysize.setter
+    def arraysize(self, value):
+        self._cursor.arraysize = value
+
+    @property
+    def row_factory(self):
+        return self._cursor.row_factory
+
+    @row_factory.setter
+    def row_factory(self, value):
+        self._cursor.row_factory = value
+
+    async def execute(self, operation, parameters=None, timeout=None):
+        await self._connection._run(self._cursor.execute, operation, parameters,
+                                    timeout)
+        return self
+
+    async def executemany(self, operation, seq_of_parameters=None, timeout=None):
+        await self._connection._run(self._cursor.executemany, operation,
+                                    seq_of_parameters, timeout)
+        return self
+
+    def _fetch(self, func, *args):
+        # Buffered results are already in memory; only streaming cursors
+        # go back to the library while fetching.
+        if self._cursor._streaming:
+            return self._connection._run(func, *args)
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(func(*args))
+        return future
+
+    async def fetchone(self):
+        return await self._fetch(self._cursor.fetchone)
+
+    async def fetchmany(self, size=None):
+        return await self._fetch(self._cursor.fetchmany, size)
+
+    async def fetchall(self):
+        return await self._fetch(self._cursor.fetchall)
+
+    async def close(self):
+        await self._fetch(self._cursor.close)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        row = await self.fetchone()
+        if row is None:
+            raise StopAsyncIteration
+        return row
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, exc_traceback):
+        await self.close()
+
+
+class AsyncConnection(object):
+
+    def __init__(self, connection, executor=None):
+        self._connection = connection
+        self._executor = executor
+
+    @property
+    def connection(self):
+        """The wrapped blocking Connection."""
+        return self._connection
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        # The call only counts as running once it holds the connection's
+        # lock, so cancelling a call still queued behind another one never
+        # interrupts the other one's statement.  ``guard`` keeps the call
+        # from finishing between the check and the interrupt.
+        guard = threading.Lock()
+        state = {'running': False, 'cancelled': False}
+
+        def call():
+            with self._connection._lock:
+                with guard:
+                    if state['cancelled']:
+                        # Cancelled while queued: nobody awaits the result.
+                        return None
+                    state['running'] = True
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    with guard:
+                        state['running'] = False
+
+        try:
+            return await loop.run_in_executor(self._executor, call)
+        except asyncio.CancelledError:
+            # Cancelling the await does not stop a call that already started
+            # in the executor; abort its statement so it stops holding the
+            # connection.
+            with guard:
+                state['cancelled'] = True
+                if state['running'] and \
+                        hasattr(self._connection.libdqlite, 'dqlite_interrupt'):
+                    self._connection.interrupt()
+            raise
+
+    def cursor(self, *, streaming=False, lazy=False):
+        # Connection.cursor() caches one cursor per thread, which would be
+        # shared by every coroutine dispatched to the same executor thread.
+        return AsyncCursor(self, Cursor(self._connection, streaming=streaming,
+                                        lazy=lazy))
+
+    async def execute(self, statement, parameters=None, timeout=None):
+        cursor = self.cursor()
+        await cursor.execute(statement, parameters, timeout)
+        return cursor
+
+    async def executemany(self, statement, seq_of_parameters=None, timeout=None):
+        cursor = self.cursor()
+        await cursor.executemany(statement, seq_of_parameters, timeout)
+        return cursor
+
+    @property
+    def row_factory(self):
+        return self._connection.row_factory
+
+    @row_factory.setter
+    def row_factory(self, value):
+        self._connection.row_factory = value
+
+    @property
+    def in_transaction(self):
+        return self._connection.in_transaction
+
+    async def commit(self):
+        await self._run(self._connection.commit)
+
+    async def rollback(self):
+        await self._run(self._connection.rollback)
+
+    def interrupt(self):
+        """Abort the statement running on the connection; see
+        Connection.interrupt()."""
+        self._connection.interrupt()
+
+    async def close(self):
+        await self._run(self._connection.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, exc_traceback):
+        await self.close()
+
+
+async def connect(*args, **kwargs):
+    """Open a Connection without blocking the event loop.
+
+    Takes the same arguments as pydqlite.dbapi2.connect, plus an optional
+    ``executor`` used for every blocking call made through the connection.
+    """
+    executor = kwargs.pop('executor', None)
+    loop = asyncio.get_running_loop()
+    connection = await loop.run_in_executor(
+        executor, functools.partial(Connection, *args, **kwargs))
+    return AsyncConnection(connection, executor=executor)
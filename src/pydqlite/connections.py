@@ -1,36 +1,68 @@
-
 from __future__ import unicode_literals
 
-
-import ctypes
-import pkg_resources
-
-
-
 import codecs
+import contextlib
+import ctypes
+import itertools
+import json
 import logging
-
-try:
-    from http.client import HTTPConnection
-except ImportError:
-    # pylint: disable=import-error
-    from httplib import HTTPConnection
-
-try:
-    from urllib.parse import urlparse
-except ImportError:
-    # pylint: disable=import-error
-    from urlparse import urlparse
+import re
+import threading
+import time
+from collections import OrderedDict
 
 from .constants import (
+    DQLITE_CONN_LOST,
+    DQLITE_NOT_LEADER,
+    RESULT_FORMAT_COLUMNAR,
+    RESULT_FORMAT_JSON,
     UNLIMITED_REDIRECTS,
 )
 
+from . import _columnar, _native
 from .cursors import Cursor
-from ._ephemeral import EphemeralDqlited as _EphemeralDqlited
+from .pipeline import Pipeline
+from .retry import RetryPolicy
 from .extensions import PARSE_DECLTYPES, PARSE_COLNAMES
 
 
+# Format identifiers understood by dqlite_set_format.
+_result_format_codes = {
+    RESULT_FORMAT_JSON: 0,
+    RESULT_FORMAT_COLUMNAR: 1,
+}
+
+_rollback_to_re = re.compile(r'\bTO\b', re.IGNORECASE)
+
+
+def _parse_address(address):
+    """Turn "host:port", "[v6]:port" or (host, port) into (host, port)."""
+    if isinstance(address, (tuple, list)):
+        host, port = address
+    else:
+        host, _, port = address.rpartition(':')
+        host = host.strip('[]')
+    return host, int(port)
+
+
+def _format_address(address):
+    host, port = address
+    return '[{}]:{}'.format(host, port) if ':' in host else '{}:{}'.format(host, port)
+
+
+def _milliseconds(seconds):
+    # 0 and None mean no limit; never round a positive timeout down to 0.
+    if not seconds:
+        return 0
+    return max(1, int(seconds * 1000))
+
+
+def _check_isolation_level(isolation_level):
+    if isolation_level is not None and \
+            isolation_level.upper() not in ('', 'DEFERRED', 'IMMEDIATE', 'EXCLUSIVE'):
+        raise ValueError('invalid value for isolation_level: {!r}'.format(isolation_level))
+
+
 class Connection(object):
 
     from .exceptions import (
@@ -48,7 +80,13 @@ class Connection(object):
 
     def __init__(self, host='localhost', port=9001, database="hci_db",
                  user=None, password=None, connect_timeout=None,
-                 detect_types=0, max_redirects=UNLIMITED_REDIRECTS):
+                 detect_types=0, max_redirects=UNLIMITED_REDIRECTS,
+                 result_format=RESULT_FORMAT_COLUMNAR, cached_statements=128,
+                 isolation_level='', nodes=None, retry_policy=None,
+                 timeout=None):
+        if result_format not in _result_format_codes:
+            raise ValueError('unknown result format: {!r}'.format(result_format))
+        _check_isolation_level(isolation_level)
         self.messages = []
         self.host = host
         self.port = port
@@ -58,86 +96,229 @@ class Connection(object):
             self._headers['Authorization'] = 'Basic ' + \
                 codecs.encode('{}:{}'.format(user, password).encode('utf-8'),
                               'base64').decode('utf-8').rstrip('\n')
+        # Seconds allowed for opening a session on one node, and the
+        # default limit for every statement (None for no limit).
         self.connect_timeout = connect_timeout
+        self.timeout = timeout
+        # Number of leader hops followed when connecting.
         self.max_redirects = max_redirects
+        self.retry_policy = RetryPolicy() if retry_policy is None else retry_policy
         self.detect_types = detect_types
         self.parse_decltypes = detect_types & PARSE_DECLTYPES
         self.parse_colnames = detect_types & PARSE_COLNAMES
+        # The format asked for; result_format holds the one the current
+        # session actually negotiated.
+        self._requested_result_format = result_format
+        self.result_format = RESULT_FORMAT_JSON
         self._ephemeral = None
         if host == ':memory:':
-            self._ephemeral = _EphemeralDqlited().__enter__()
+            # Imported here: it pulls in subprocess, tempfile and socket.
+            from ._ephemeral import EphemeralDqlited
+            self._ephemeral = EphemeralDqlited().__enter__()
             self.host, self.port = self._ephemeral.http
-            
-        # 加载 Go 共享库
-        #libdqlite = ctypes.CDLL('./libdqlite.so')
-        # 获取 libdqlite.so 的路径
-        lib_path = pkg_resources.resource_filename('pydqlite', 'libdqlite.so')
-
-        # 加载 Go 共享库
-        self.libdqlite = ctypes.CDLL(lib_path)
-
-        # 定义函数原型
-        self.libdqlite.dqlite_connect.argtypes = [ctypes.c_char_p, ctypes.c_char_p]
-        self.libdqlite.dqlite_connect.restype = ctypes.c_int
-
-        self.libdqlite.dqlite_query.argtypes = [ctypes.c_char_p]
-        self.libdqlite.dqlite_query.restype = ctypes.c_char_p
-
-        self.libdqlite.dqlite_disconnect.argtypes = []
-        self.libdqlite.dqlite_disconnect.restype = None    
-        self._connection = self._init_connection()
-        self._current_cursor = None
+        # Cluster members to try, refreshed from the cluster once connected,
+        # and the last node known to be the leader.
+        self.nodes = [_parse_address(node) for node in nodes] if nodes \
+            else [(self.host, self.port)]
+        self._leader = None
+        self._needs_reconnect = False
+
+        self._handle = None
+        self._closed = False
+        # The native session is not re-entrant: calls on one handle are
+        # serialized, while calls on different handles run in parallel
+        # (ctypes.CDLL drops the GIL for the duration of a foreign call).
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self.libdqlite = _native.load_library()
+        self._supports_prepare = hasattr(self.libdqlite, 'dqlite_prepare')
+        self._supports_streaming = hasattr(self.libdqlite, 'dqlite_rows_open')
+        self._supports_batch = hasattr(self.libdqlite, 'dqlite_exec_batch')
+        self._supports_timeout = hasattr(self.libdqlite, 'dqlite_set_timeout')
+        self._supports_pipeline = hasattr(self.libdqlite, 'dqlite_submit')
+        self._supports_exec = hasattr(self.libdqlite, 'dqlite_exec')
+        self._check_timeout(timeout)
+        # Statement timeout currently set on the native session.
+        self._session_timeout = None
+        # SQL text -> prepared statement id, least recently used first.
+        self.cached_statements = cached_statements
+        self._statements = OrderedDict()
+        # (SQL text, column signature, ...) -> converter plan, least
+        # recently used first; see Cursor._converter_plan.
+        self._converter_plans = OrderedDict()
+        # As in sqlite3: None means autocommit, otherwise a BEGIN of that
+        # flavour is issued implicitly before the first write.
+        self._isolation_level = isolation_level
+        self._in_transaction = False
+        # Set when the session dies inside a transaction, until rollback().
+        self._transaction_lost = False
+        self._savepoint_ids = itertools.count(1)
+        # Default row_factory of the cursors of this connection.
+        self.row_factory = None
+        self._handle = self._init_connection()
 
     def _init_connection(self):
-        # return HTTPConnection(self.host, port=self.port,
-        #                       timeout=None if self.connect_timeout is None else float(self.connect_timeout))
-        
-     
-        node_address = f"{self.host}:{self.port}".encode()
+        """Open a session on the cluster leader.
+
+        The cached leader is tried first, then every known node; the
+        session follows leader hints from the node it reached, up to
+        max_redirects times."""
+        candidates = [self._leader] if self._leader else []
+        candidates.extend(node for node in self.nodes if node != self._leader)
+        errors = []
+        for address in candidates:
+            try:
+                handle = self._connect_leader(address)
+            except self.OperationalError as e:
+                errors.append(str(e))
+                continue
+            self.result_format = self._negotiate_result_format(handle)
+            return handle
+        self._leader = None
+        error = self.OperationalError(
+            'unable to connect to any dqlite node: {}'.format('; '.join(errors)))
+        error.dqlite_code = DQLITE_CONN_LOST
+        raise error
+
+    def _connect_node(self, address):
+        node_address = _format_address(address).encode()
         database_name = f"{self.database}".encode()
-        connection = self.libdqlite.dqlite_connect(node_address, database_name)
-        return connection
-
-    def _retry_request(self, method, uri, body=None, headers={}):
-        tries = 10
-        while tries:
-            tries -= 1
+        if self.connect_timeout is not None and \
+                hasattr(self.libdqlite, 'dqlite_connect_timeout'):
+            handle = self.libdqlite.dqlite_connect_timeout(
+                node_address, database_name, _milliseconds(self.connect_timeout))
+        else:
+            handle = self.libdqlite.dqlite_connect(node_address, database_name)
+        if not handle:
+            raise self.OperationalError(
+                'unable to connect to dqlite node {} database {!r}'.format(
+                    _format_address(address), self.database))
+        return handle
+
+    def _connect_leader(self, address):
+        handle = self._connect_node(address)
+        redirects = 0
+        visited = {address}
+        while True:
+            leader = self._ask_leader(handle)
+            if leader is None or leader == address or \
+                    (self.max_redirects != UNLIMITED_REDIRECTS and
+                     redirects >= self.max_redirects):
+                break
+            if leader in visited:
+                # Nodes naming each other as leader, e.g. mid-election.
+                self.libdqlite.dqlite_disconnect(handle)
+                raise self.OperationalError(
+                    'leader redirect loop: node {} names {} as leader'.format(
+                        _format_address(address), _format_address(leader)))
+            visited.add(leader)
+            logging.getLogger(__name__).debug(
+                "node %s is not the leader, following %s",
+                _format_address(address), _format_address(leader))
+            redirects += 1
+            self.libdqlite.dqlite_disconnect(handle)
+            address = leader
+            handle = self._connect_node(address)
+
+        self._leader = address
+        self.host, self.port = address
+        self._refresh_nodes(handle)
+        return handle
+
+    def _ask_leader(self, handle):
+        if not hasattr(self.libdqlite, 'dqlite_leader'):
+            return None
+        try:
+            with self._native_call_on(handle, self.libdqlite.dqlite_leader) as view:
+                leader = str(view, 'utf-8')
+        except self.OperationalError:
+            return None
+        return _parse_address(leader) if leader else None
+
+    def _refresh_nodes(self, handle):
+        """Replace the known members with the cluster's own view of itself,
+        keeping configured nodes it does not mention as a last resort."""
+        if not hasattr(self.libdqlite, 'dqlite_cluster'):
+            return
+        try:
+            with self._native_call_on(handle, self.libdqlite.dqlite_cluster) as view:
+                members = [_parse_address(node) for node in json.loads(str(view, 'utf-8'))]
+        except (self.OperationalError, ValueError):
+            return
+        if members:
+            self.nodes = members + [node for node in self.nodes if node not in members]
+
+    def _negotiate_result_format(self, handle):
+        """Ask the session for the requested result encoding, falling back
+        to JSON when the library is too old or declines it."""
+        requested = self._requested_result_format
+        if requested == RESULT_FORMAT_JSON or \
+                not hasattr(self.libdqlite, 'dqlite_set_format'):
+            return RESULT_FORMAT_JSON
+        if self.libdqlite.dqlite_set_format(
+                handle, _result_format_codes[requested]) != 0:
+            logging.getLogger(__name__).debug(
+                "result format %r not supported, using JSON", requested)
+            return RESULT_FORMAT_JSON
+        return requested
+
+    def _disconnect(self):
+        with self._lock:
+            # Prepared statements and any open transaction die with the
+            # session that owns them.
+            self._statements.clear()
+            self._in_transaction = False
+            self._session_timeout = None
+            if self._handle is not None:
+                handle, self._handle = self._handle, None
+                self.libdqlite.dqlite_disconnect(handle)
+
+    def _reconnect(self):
+        """Replace the native session with a freshly opened one."""
+        with self._lock:
+            self._disconnect()
+            # Left set if no node can be reached, so the next call tries again.
+            self._needs_reconnect = True
+            self._handle = self._init_connection()
+            self._needs_reconnect = False
+
+    def _ping(self):
+        """Return True if the native session can still run a statement."""
+        try:
+            return bool(self.query(b'SELECT 1'))
+        except self.Error:
+            return False
+
+    def _retry(self, func, *args, **kwargs):
+        """Call ``func`` under the connection's retry policy.
+
+        Between attempts the session is reopened, failing over to another
+        node if need be.  A statement that fails inside a transaction is
+        never retried, since the transaction died with the session; pass
+        ``idempotent=False`` for statements that change data."""
+        idempotent = kwargs.pop('idempotent', True)
+        policy = self.retry_policy
+        started = time.monotonic()
+        in_transaction = self._in_transaction
+        attempt = 1
+        while True:
             try:
-                self._connection.request(method, uri, body=body,
-                                         headers=dict(self._headers, **headers))
-                return self._connection.getresponse()
-            except Exception:
-                if not tries:
+                return func(*args, **kwargs)
+            except self.OperationalError as e:
+                delay = policy.backoff(attempt)
+                if in_transaction or not policy.should_retry(
+                        e, attempt, idempotent, time.monotonic() - started, delay):
                     raise
-                self._connection.close()
-                self._connection = self._init_connection()
-
-    # def _fetch_response(self, method, uri, body=None, headers={}):
-    #     """
-    #     Fetch a response, handling redirection.
-    #     """
-    #     response = self._retry_request(method, uri, body=body, headers=headers)
-    #     redirects = 0
-
-    #     while response.status == 301 and \
-    #             response.getheader('Location') is not None and \
-    #             (self.max_redirects == UNLIMITED_REDIRECTS or redirects < self.max_redirects):
-    #         redirects += 1
-    #         uri = response.getheader('Location')
-    #         location = urlparse(uri)
-
-    #         logging.getLogger(__name__).debug("status: %s reason: '%s' location: '%s'",
-    #                                           response.status, response.reason, uri)
-
-    #         if self.host != location.hostname or self.port != location.port:
-    #             self._connection.close()
-    #             self.host = location.hostname
-    #             self.port = location.port
-    #             self._connection = self._init_connection()
-
-    #         response = self._retry_request(method, uri, body=body, headers=headers)
-
-    #     return response
+                logging.getLogger(__name__).debug(
+                    "attempt %d failed (%s), retrying in %.3fs", attempt, e, delay)
+            time.sleep(delay)
+            attempt += 1
+            try:
+                self._reconnect()
+            except self.OperationalError:
+                # Counted against the next attempt, which fails fast while
+                # the connection still needs reconnecting.
+                pass
 
     def close(self):
         """Close the connection now (rather than whenever .__del__() is
@@ -149,54 +330,401 @@ class Connection(object):
         cursor objects trying to use the connection. Note that closing
         a connection without committing the changes first will cause an
         implicit rollback to be performed."""
-        if self.libdqlite:
-            self.libdqlite.dqlite_disconnect()
+        with self._lock:
+            self._closed = True
+            # A session already lost has no statements left to release.
+            if self._handle is not None and not self._needs_reconnect:
+                for stmt in self._statements.values():
+                    self.libdqlite.dqlite_finalize(self._handle, stmt)
+            self._disconnect()
         #self._connection.close()
         if self._ephemeral is not None:
             self._ephemeral.__exit__(None, None, None)
             self._ephemeral = None
 
     def __del__(self):
-        self.close()
+        # __init__ may have failed before the native session was opened.
+        if getattr(self, '_handle', None) is not None:
+            self.close()
+
+    @property
+    def isolation_level(self):
+        return self._isolation_level
+
+    @isolation_level.setter
+    def isolation_level(self, value):
+        _check_isolation_level(value)
+        with self._lock:
+            # Switching to autocommit commits the pending transaction.
+            if value is None:
+                self.commit()
+            self._isolation_level = value
+
+    @property
+    def in_transaction(self):
+        """True while a transaction is open on the native session."""
+        return self._in_transaction
+
+    def _exec_simple(self, operation):
+        with self._result_buffer(operation):
+            pass
+
+    def _begin(self):
+        """Issue the implicit BEGIN that precedes the first write."""
+        with self._lock:
+            if self._isolation_level is not None and not self._in_transaction:
+                self._exec_simple(
+                    'BEGIN {}'.format(self._isolation_level).strip().encode())
+                self._in_transaction = True
+
+    def _track_transaction(self, operation):
+        """Follow transaction control statements run through execute()."""
+        words = operation.split(None, 2)
+        command = words[0].upper() if words else ''
+        if command in ('BEGIN', 'SAVEPOINT'):
+            self._in_transaction = True
+        elif command in ('COMMIT', 'END'):
+            self._in_transaction = False
+        elif command == 'ROLLBACK' and not _rollback_to_re.search(operation):
+            self._in_transaction = False
 
     def commit(self):
-        """Database modules that do not support transactions should
-        implement this method with void functionality."""
-        pass
-
-    # def rollback(self):
-    #     """处理事务回滚"""
-    #     print("Rolling back in rollback ...... in pydqlite")
-        
-    #     try:
-    #         # 如果 pydqlite 支持事务，可以调用底层的 rollback API
-    #         # self.libdqlite.dqlite_rollback()
-
-    #         # 如果不支持，可以抛出异常
-    #         raise NotImplementedError("Dqlite does not support rollback.")
-    #     except Exception as e:
-    #         print(f"Rollback failed: {e}")
+        """Commit the pending transaction, if any."""
+        with self._lock:
+            if self._in_transaction:
+                self._check_open()
+                self._exec_simple(b'COMMIT')
+                self._in_transaction = False
+
+    def rollback(self):
+        """Roll back the pending transaction, if any."""
+        with self._lock:
+            if self._transaction_lost:
+                # It died with its session; there is nothing left to undo.
+                self._transaction_lost = False
+                self._in_transaction = False
+                return
+            if self._in_transaction:
+                self._check_open()
+                self._exec_simple(b'ROLLBACK')
+                self._in_transaction = False
+
+    @contextlib.contextmanager
+    def savepoint(self, name=None):
+        """Run a block inside a SAVEPOINT.
+
+        The savepoint is released when the block completes and rolled back
+        to if it raises; the enclosing transaction is opened first if none
+        is pending, following isolation_level."""
+        if name is None:
+            name = 'pydqlite_sp{}'.format(next(self._savepoint_ids))
+        quoted = '"{}"'.format(name.replace('"', '""'))
+        with self._lock:
+            self._begin()
+            # Under autocommit the outermost savepoint is the transaction.
+            outermost = not self._in_transaction
+            self._exec_simple('SAVEPOINT {}'.format(quoted).encode())
+            self._in_transaction = True
+        try:
+            yield name
+        except BaseException:
+            with self._lock:
+                self._exec_simple('ROLLBACK TO {}'.format(quoted).encode())
+                self._exec_simple('RELEASE {}'.format(quoted).encode())
+                if outermost:
+                    self._in_transaction = False
+            raise
+        with self._lock:
+            self._exec_simple('RELEASE {}'.format(quoted).encode())
+            if outermost:
+                self._in_transaction = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        """Commit on success, roll back on error, like sqlite3."""
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+    def interrupt(self):
+        """Abort the statement running on this connection, if any.
+
+        Meant to be called from another thread: it does not wait for the
+        connection's lock, and the aborted statement raises
+        OperationalError in the thread that was running it."""
+        if not hasattr(self.libdqlite, 'dqlite_interrupt'):
+            raise self.NotSupportedError('libdqlite does not support interrupt()')
+        handle = self._handle
+        if handle is not None:
+            self.libdqlite.dqlite_interrupt(handle)
+
+    def _check_open(self):
+        if self._closed:
+            raise self.ProgrammingError('Cannot operate on a closed database.')
+
+    def _check_timeout(self, timeout):
+        if timeout is not None and not self._supports_timeout:
+            raise self.NotSupportedError('libdqlite does not support statement timeouts')
+
+    def _apply_timeout(self, timeout):
+        """Set the session's statement timeout, falling back to the
+        connection's own.  Must hold self._lock."""
+        if timeout is None:
+            timeout = self.timeout
+        if timeout == self._session_timeout:
+            return
+        rc = self.libdqlite.dqlite_set_timeout(
+            self._handle, _milliseconds(timeout))
+        if rc != 0:
+            raise self.OperationalError(
+                'unable to set statement timeout (code {})'.format(rc))
+        self._session_timeout = timeout
+
+    def _native_call(self, func, *args, timeout=None):
+        """Call an entry point that ends in a (void **out, size_t *out_len)
+        pair on this connection's session and return a context manager
+        yielding a memoryview over the buffer it produced.
+
+        The view aliases memory owned by libdqlite and is released, along
+        with that memory, when the block exits; copy out anything that has
+        to outlive it.  A non-zero return code raises OperationalError with
+        the message the library left in the buffer.  When that code says
+        the leader moved or the node went away, the next call reconnects
+        to the current leader first; see _ensure_session.
+
+        ``timeout`` overrides the connection's statement timeout for this
+        call only."""
+        with self._lock:
+            self._ensure_session()
+            if self._supports_timeout:
+                self._apply_timeout(timeout)
+            try:
+                return self._native_call_on(self._handle, func, *args)
+            except self.OperationalError as e:
+                if getattr(e, 'dqlite_code', None) in (DQLITE_NOT_LEADER, DQLITE_CONN_LOST):
+                    self._leader = None
+                    self._needs_reconnect = True
+                    self._transaction_lost = self._in_transaction
+                raise
+
+    def _ensure_session(self):
+        """Open a new session in place of one lost by an earlier call.
+
+        Called before relying on anything tied to the session, such as the
+        pending transaction or the prepared statement cache.  A transaction
+        dies with its session; until rollback() acknowledges that, every
+        statement raises OperationalError rather than running outside it."""
+        with self._lock:
+            self._check_open()
+            if self._transaction_lost:
+                raise self.OperationalError(
+                    'the session was lost inside a transaction; call rollback()')
+            if self._needs_reconnect:
+                self._reconnect()
+
+    def _native_call_on(self, handle, func, *args):
+        buf = ctypes.c_void_p()
+        size = ctypes.c_size_t()
+        rc = func(handle, *(args + (ctypes.byref(buf), ctypes.byref(size))))
+        if rc != 0:
+            try:
+                message = ctypes.string_at(buf.value, size.value).decode(
+                    'utf-8', 'replace') if buf.value else ''
+            finally:
+                if buf.value:
+                    self.libdqlite.dqlite_free(buf)
+            error = self.OperationalError(
+                message or '{} failed with code {}'.format(func.__name__, rc))
+            error.dqlite_code = rc
+            raise error
+        return self._borrow_buffer(buf, size.value)
+
+    @contextlib.contextmanager
+    def _borrow_buffer(self, buf, size):
+        try:
+            if buf.value:
+                view = memoryview(
+                    (ctypes.c_char * size).from_address(buf.value)).cast('B')
+            else:
+                view = memoryview(b'')
+            with view:
+                yield view
+        finally:
+            if buf.value:
+                self.libdqlite.dqlite_free(buf)
+
+    def _result_buffer(self, operation, timeout=None):
+        return self._native_call(self.libdqlite.dqlite_query, operation,
+                                 timeout=timeout)
+
+    def _prepare(self, operation):
+        """Return the id of a prepared statement for ``operation``, from
+        the statement cache when possible."""
+        with self._lock:
+            stmt = self._statements.pop(operation, None)
+            if stmt is None:
+                stmt_id = ctypes.c_uint64()
+                with self._native_call(self.libdqlite.dqlite_prepare,
+                                       operation, ctypes.byref(stmt_id)):
+                    pass
+                stmt = stmt_id.value
+                while self._statements and \
+                        len(self._statements) >= self.cached_statements:
+                    _, evicted = self._statements.popitem(last=False)
+                    self.libdqlite.dqlite_finalize(self._handle, evicted)
+            self._statements[operation] = stmt
+            return stmt
+
+    def _statement_result(self, operation, values, timeout=None):
+        """Run ``operation`` as a prepared statement with ``values`` bound
+        natively; returns the same context manager as _native_call."""
+        params = _columnar.encode_params(values)
+        with self._lock:
+            self._ensure_session()
+            stmt = self._prepare(operation)
+            return self._native_call(self.libdqlite.dqlite_query_stmt,
+                                     stmt, params, len(params), timeout=timeout)
+
+    def _open_rows(self, operation, values, timeout=None):
+        """Start a server-side cursor over ``operation``; returns its id."""
+        params = _columnar.encode_params(values or [])
+        rows_id = ctypes.c_uint64()
+        with self._native_call(self.libdqlite.dqlite_rows_open, operation,
+                               params, len(params), ctypes.byref(rows_id),
+                               timeout=timeout):
+            pass
+        return rows_id.value
+
+    def _next_rows(self, rows_id, max_rows, timeout=None):
+        return self._native_call(self.libdqlite.dqlite_rows_next, rows_id,
+                                 max_rows, timeout=timeout)
+
+    def _close_rows(self, rows_id):
+        with self._lock:
+            # Server-side cursors die with the session that owns them.
+            if self._handle is not None:
+                self.libdqlite.dqlite_rows_close(self._handle, rows_id)
+
+    def _execute_batch(self, operation, param_sets, batch_size, timeout=None):
+        """Run ``operation`` once per encoded parameter set, ``batch_size``
+        sets per native call, and return the number of rows changed.
+        ``timeout`` applies to each native call.
+
+        The batch either applies completely or not at all.  Under
+        autocommit it runs in a transaction committed here; inside a
+        pending transaction it runs in a savepoint, so a failure undoes the
+        batch but not the writes made before it."""
+        rowcount = 0
+        with self._lock:
+            self._ensure_session()
+            self._begin()
+            own_transaction = not self._in_transaction
+            if own_transaction:
+                self._exec_simple(b'BEGIN')
+                self._in_transaction = True
+            else:
+                savepoint = '"pydqlite_sp{}"'.format(next(self._savepoint_ids)).encode()
+                self._exec_simple(b'SAVEPOINT ' + savepoint)
+            try:
+                param_sets = iter(param_sets)
+                chunk = list(itertools.islice(param_sets, batch_size))
+                while chunk:
+                    batch = _columnar.encode_batch(chunk)
+                    changed = ctypes.c_uint64()
+                    with self._native_call(self.libdqlite.dqlite_exec_batch,
+                                           operation, batch, len(batch),
+                                           ctypes.byref(changed),
+                                           timeout=timeout):
+                        pass
+                    rowcount += changed.value
+                    chunk = list(itertools.islice(param_sets, batch_size))
+            except BaseException:
+                try:
+                    if own_transaction:
+                        self.rollback()
+                    else:
+                        self._exec_simple(b'ROLLBACK TO ' + savepoint)
+                        self._exec_simple(b'RELEASE ' + savepoint)
+                except self.Error:
+                    # Keep the original error; the session may be gone.
+                    pass
+                raise
+            if own_transaction:
+                self.commit()
+            else:
+                self._exec_simple(b'RELEASE ' + savepoint)
+        return rowcount
+
+    def _execute_operation(self, operation, values, is_write=False, timeout=None):
+        with self._lock:
+            self._ensure_session()
+            if is_write:
+                self._begin()
+            if values is None:
+                return self._result_buffer(operation, timeout)
+            return self._statement_result(operation, values, timeout)
+
+    def _execute_write(self, operation, values, timeout=None):
+        """Run ``operation`` for its effect and return ``(rowcount,
+        lastrowid)`` as reported by the library, without building a
+        result."""
+        last_id = ctypes.c_int64()
+        changed = ctypes.c_uint64()
+        params = _columnar.encode_params(values or [])
+        with self._lock:
+            self._ensure_session()
+            self._begin()
+            if values is not None and self._supports_prepare and \
+                    hasattr(self.libdqlite, 'dqlite_exec_stmt'):
+                func, target = self.libdqlite.dqlite_exec_stmt, self._prepare(operation)
+            else:
+                func, target = self.libdqlite.dqlite_exec, operation
+            with self._native_call(func, target, params, len(params),
+                                   ctypes.byref(last_id), ctypes.byref(changed),
+                                   timeout=timeout):
+                pass
+        return changed.value, last_id.value
 
     def query(self, operation, parameters=None):
-
-        result =  self.libdqlite.dqlite_query(operation)
-        return result
-    
-    def cursor(self):
-        """返回新的游标对象，并保存游标"""
+        with self._result_buffer(operation) as result:
+            return bytes(result)
+
+    @property
+    def _current_cursor(self):
+        return getattr(self._local, 'cursor', None)
+
+    @_current_cursor.setter
+    def _current_cursor(self, cursor):
+        self._local.cursor = cursor
+
+    def cursor(self, *, streaming=False, lazy=False):
+        """返回新的游标对象，并保存游标
+
+        The saved cursor is per thread, so threads sharing a connection
+        never see each other's result sets.  With ``streaming`` a new
+        server-side cursor is returned instead, which pulls rows from the
+        library ``arraysize`` at a time rather than buffering the result.
+        With ``lazy`` a new cursor is returned whose columnar results are
+        only decoded and converted value by value as rows are read."""
+        if streaming or lazy:
+            return Cursor(self, streaming=streaming, lazy=lazy)
         if self._current_cursor is not None:
-            print("old Cursor 1111111111111111111")
             return self._current_cursor
         else:
-            print("new Cursor222222222222222222222222")
             self._current_cursor = Cursor(self)
             return self._current_cursor
-    
 
-    def execute(self, statement, parameters=None):
+    def pipeline(self, max_in_flight=64):
+        """Return a Pipeline that runs statements submitted to it without
+        waiting for each result before sending the next."""
+        return Pipeline(self, max_in_flight)
+
+    def execute(self, statement, parameters=None, timeout=None):
         """执行查询并返回游标"""
-        print("2222222jjjjjjjjjjjjjjjjjjjjjjjjjjjjjj")
         if self._current_cursor is None:
             self._current_cursor = self.cursor()
-        self._current_cursor.execute(statement, parameters)
+        self._current_cursor.execute(statement, parameters, timeout=timeout)
         return self._current_cursor
@@ -12,3 +12,17 @@ __license__ = "MIT"
 __description__ = "Python dbapi2 driver for dqlite"
 
 UNLIMITED_REDIRECTS = -1
+
+RESULT_FORMAT_JSON = 'json'
+RESULT_FORMAT_COLUMNAR = 'columnar'
+
+# Return codes of libdqlite entry points.  Any other non-zero code is a
+# plain statement error.
+DQLITE_OK = 0
+DQLITE_ERROR = 1
+DQLITE_NOT_LEADER = 2
+DQLITE_CONN_LOST = 3
+# The statement was aborted by Connection.interrupt().
+DQLITE_INTERRUPTED = 4
+# The statement ran past the session's timeout.
+DQLITE_TIMEOUT = 5
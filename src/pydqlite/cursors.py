@@ -2,50 +2,163 @@
 from __future__ import unicode_literals
 
 from collections import OrderedDict
-import json
+import array
+import functools
+import itertools
 import logging
 import sys
 import re
-import datetime
 
-try:
-    # pylint: disable=no-name-in-module
-    from urllib.parse import urlencode
-except ImportError:
-    # pylint: disable=no-name-in-module
-    from urllib import urlencode
+from .exceptions import NotSupportedError, ProgrammingError
 
-from .exceptions import Error, ProgrammingError
-
-from .row import Row
-from .extensions import _convert_to_python, _adapt_from_python, _column_stripper
+from . import _columnar, _jsonresult, _numpy, extensions
+from .constants import RESULT_FORMAT_COLUMNAR
+from .row import LazyRow, _ColumnIndex
+from .extensions import (_convert_to_python, _adapt_from_python, _adapt_value,
+                         _column_stripper, converters)
 
 
 if sys.version_info[0] >= 3:
     basestring = str
-    _urlencode = urlencode
-else:
-    # avoid UnicodeEncodeError from urlencode
-    def _urlencode(query, doseq=0):
-        return urlencode(dict(
-            (k if isinstance(k, bytes) else k.encode('utf-8'),
-             v if isinstance(v, bytes) else v.encode('utf-8'))
-            for k, v in query.items()), doseq=doseq)
+
+
+_logger = logging.getLogger(__name__)
+
+# Default number of rows a streaming cursor pulls from the library per call.
+STREAMING_ARRAYSIZE = 1000
+
+# Default of Cursor.row_factory, standing for the connection's.
+_UNSET = object()
+
+# Statements preceded by an implicit BEGIN, as in sqlite3.
+_dml_commands = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+_qmark_re = re.compile(r"(\?)")
+_named_re = re.compile(r"(:{1}[a-zA-Z]+?\b)")
+
+
+@functools.lru_cache(maxsize=256)
+def _find_placeholders(operation):
+    """Return the '?' and ':name' placeholders of ``operation``."""
+    return tuple(_qmark_re.findall(operation)), tuple(_named_re.findall(operation))
+
+
+class _ColumnRows(object):
+    """Rows of a columnar result, held column by column; the row tuples
+    are only built once a row is asked for."""
+
+    __slots__ = ('columns', '_rows')
+
+    def __init__(self, columns):
+        self.columns = columns
+        self._rows = None
+
+    @property
+    def rows(self):
+        if self._rows is None:
+            self._rows = list(zip(*self.columns))
+        return self._rows
+
+    def __len__(self):
+        return len(self.columns[0]) if self.columns else 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice) and self._rows is None:
+            # A slice only zips the values it covers.
+            return list(zip(*[column[index] for column in self.columns]))
+        return self.rows[index]
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+class _LazyRows(object):
+    """Rows of a columnar result decoded on demand from LazyColumns."""
+
+    __slots__ = ('_columns', '_index', '_nrows', '_values')
+
+    def __init__(self, columns, index, nrows):
+        self._columns = columns
+        self._index = index
+        self._nrows = nrows
+        self._values = None
+
+    @property
+    def columns(self):
+        """Every column fully decoded, for column-wise fetches."""
+        if self._values is None:
+            self._values = [column.values() for column in self._columns]
+        return self._values
+
+    def __len__(self):
+        return self._nrows
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [LazyRow(self._columns, j, self._index)
+                    for j in range(*i.indices(self._nrows))]
+        if i < 0:
+            i += self._nrows
+        if not 0 <= i < self._nrows:
+            raise IndexError('row index out of range')
+        return LazyRow(self._columns, i, self._index)
+
+    def __iter__(self):
+        return (LazyRow(self._columns, i, self._index) for i in range(self._nrows))
+
+
+def _compact_column(pieces):
+    """Join the pieces of a column fetched chunk by chunk, as an array when
+    it holds only integers or only floats."""
+    typecodes = set(piece.typecode if isinstance(piece, array.array) else None
+                    for piece in pieces)
+    if len(typecodes) == 1 and None not in typecodes:
+        column = array.array(typecodes.pop())
+        for piece in pieces:
+            column.extend(piece)
+        return column
+    values = list(itertools.chain.from_iterable(pieces))
+    if values:
+        if all(type(value) is int for value in values):
+            try:
+                return array.array('q', values)
+            except OverflowError:
+                return values
+        if all(type(value) is float for value in values):
+            return array.array('d', values)
+    return values
 
 
 class Cursor(object):
     arraysize = 1
+    # Parameter sets handed to the library per call by executemany().
+    batchsize = 1000
 
-    def __init__(self, connection, debug=False):
+    def __init__(self, connection, debug=False, streaming=False, lazy=False):
         self._connection = connection
         self.messages = []
         self.lastrowid = None
         self.description = None
         self.rownumber = 0
         self.rowcount = -1
-        self.arraysize = 1
+        self.arraysize = STREAMING_ARRAYSIZE if streaming else 1
         self._rows = None
+        # Server-side cursor id while a streamed result is open, and the
+        # rownumber of the first row held in self._rows.
+        self._streaming = streaming
+        # Decode columnar results value by value, as rows are read.
+        self._lazy = lazy
+        self._stream = None
+        self._chunk_start = 0
+        # Statement timeout that every chunk of the open stream runs under.
+        self._stream_timeout = None
         self._column_type_cache = {}
+        # Statement whose result is being read, for converter plan lookups.
+        self._operation = None
+        # Set through the row_factory property; _UNSET follows the
+        # connection's.
+        self._row_factory = _UNSET
+        self._column_index = None
         self.debug = debug
 
     def __enter__(self):
@@ -58,9 +171,27 @@ class Cursor(object):
     def connection(self):
         return self._connection
 
+    @property
+    def row_factory(self):
+        """As in sqlite3: called as row_factory(cursor, row) on every row
+        fetched, e.g. pydqlite.row.Row.  Unless set on the cursor it is the
+        connection's row_factory at the time rows are fetched."""
+        factory = self._row_factory
+        return self._connection.row_factory if factory is _UNSET else factory
+
+    @row_factory.setter
+    def row_factory(self, value):
+        self._row_factory = value
+
     def close(self):
+        self._close_stream()
         self._rows = None
 
+    def _close_stream(self):
+        if self._stream is not None:
+            stream, self._stream = self._stream, None
+            self._connection._close_rows(stream)
+
     # def _request(self, method, uri, body=None, headers={}):
     #     logger = logging.getLogger(__name__)
     #     debug = logger.getEffectiveLevel() < logging.DEBUG
@@ -91,20 +222,15 @@ class Cursor(object):
     #                 indent=4))
     #     return response_json
 
-    #TODO: remove this -- pass args directly to DB and let it do param subst
-    def _substitute_params(self, operation, parameters):
+    def _ordered_params(self, operation, parameters):
         '''
-        SQLite natively supports only the types TEXT, INTEGER, REAL, BLOB and
-        NULL
+        Check ``parameters`` against the placeholders of ``operation`` and
+        return ``(placeholder, value)`` pairs in binding order: one per '?',
+        or one per distinct ':name' in order of first appearance, which is
+        how SQLite numbers named parameters.
         '''
 
-        param_matches = 0
-
-        qmark_re = re.compile(r"(\?)")
-        named_re = re.compile(r"(:{1}[a-zA-Z]+?\b)")
-
-        qmark_matches = qmark_re.findall(operation)
-        named_matches = named_re.findall(operation)
+        qmark_matches, named_matches = _find_placeholders(operation)
         param_matches = len(qmark_matches) + len(named_matches)
 
         # Matches but no parameters
@@ -114,7 +240,7 @@ class Cursor(object):
 
         # No regex matches and no parameters.
         if parameters is None:
-            return operation
+            return []
 
         if len(qmark_matches) > 0 and len(named_matches) > 0:
             raise ProgrammingError('different paramater types in operation not'
@@ -127,14 +253,13 @@ class Cursor(object):
                 raise ProgrammingError('Unamed binding used, but you supplied '
                                        'a dictionary (which has only names): '
                                        '%s %s' % (operation, parameters))
-            for op_key in named_matches:
-                try:
-                    operation = operation.replace(op_key, 
-                                                 _adapt_from_python(parameters[op_key[1:]]))
-                except KeyError:
-                    raise ProgrammingError('the named parameters given do not '
-                                           'match operation: %s %s' %
-                                           (operation, parameters))
+            try:
+                return [(op_key, parameters[op_key[1:]])
+                        for op_key in OrderedDict.fromkeys(named_matches)]
+            except KeyError:
+                raise ProgrammingError('the named parameters given do not '
+                                       'match operation: %s %s' %
+                                       (operation, parameters))
         else:
             # parameters is a sequence
             if param_matches != len(parameters):
@@ -145,12 +270,29 @@ class Cursor(object):
                 raise ProgrammingError('Named binding used, but you supplied a'
                                        ' sequence (which has no names): %s %s' %
                                        (operation, parameters))
-            for i in range(len(parameters)):
-                operation = operation.replace('?', 
-                                              _adapt_from_python(parameters[i]), 1)
+            return [('?', value) for value in parameters]
+
+    def _substitute_params(self, operation, parameters):
+        '''
+        SQLite natively supports only the types TEXT, INTEGER, REAL, BLOB and
+        NULL
 
+        Used only when libdqlite cannot bind parameters itself.
+        '''
+        for placeholder, value in self._ordered_params(operation, parameters):
+            operation = operation.replace(placeholder, _adapt_from_python(value),
+                                          1 if placeholder == '?' else -1)
         return operation
 
+    def _bind_operation(self, operation, parameters):
+        """Return the encoded SQL and, when the library supports prepared
+        statements, the adapted values to bind to it natively."""
+        if self._connection._supports_prepare:
+            values = [_adapt_value(value) for _, value
+                      in self._ordered_params(operation, parameters)]
+            return operation.encode(), values
+        return self._substitute_params(operation, parameters).encode(), None
+
     def _get_sql_command(self, sql_str):
         return sql_str.split(None, 1)[0].upper()
 
@@ -209,91 +351,137 @@ class Cursor(object):
 
 
     def process_datetime(self, value):
-        try:
-        # 先尝试解析带有毫秒的 ISO 8601 格式
-            try:
-                dt = datetime.datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%fZ")
-            except ValueError:
-                # 如果失败，再尝试解析不带毫秒的 ISO 8601 格式
-                dt = datetime.datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ")
-            
-        except ValueError as e:
-            raise ValueError(f"Couldn't parse datetime string: {value}") from e
-
-        formatted_date = dt.strftime('%Y-%m-%d %H:%M:%S')
-        return formatted_date
-        
-        
-    def _parse_query_result(self, query_result_str):
-        # 解析 JSON 字符串
-        try:
-            result_json = json.loads(query_result_str)
-        except json.JSONDecodeError as e:
-            print(f"Failed to parse query result: {e} 返回两个空列表")
-            return [], []
-
-        # 提取列名
-        columns = []
-        if "columns" in result_json:
-            for col_info in result_json["columns"]:
-                columns.append((
-                    col_info.get("name"),
-                    None,
-                    None,
-                    None,
-                    None,
-                    None,
-                    None,
-                    col_info.get("type")
-                ))
-
-        # 提取行数据并根据列类型转换数据
-        rows = []
-        if "rows" in result_json:
-            for row in result_json["rows"]:
-                parsed_row = []
-                for value, col_info in zip(row, result_json["columns"]):
-                    # 如果列类型是 DATETIME，使用 process_datetime 进行转换
-                    if col_info.get("type") == "TIME":
-                        value = self.process_datetime(value)
-                    parsed_row.append(value)
-                rows.append(parsed_row)
-
-        return columns, rows
-
-    def execute(self, operation, parameters=None):
-        print(f"222222 execute {self.rownumber}")
+        return extensions._format_timestamp(value)
+
+    def _parse_query_result(self, query_result):
+        if self._connection.result_format == RESULT_FORMAT_COLUMNAR:
+            return self._parse_columnar_result(query_result)
+
+        columns, rows = _jsonresult.decode(query_result, self._converter_plan)
+        return self._strip_column_names(columns), rows
+
+    def _parse_columnar_result(self, query_result):
+        if self._lazy:
+            return self._parse_lazy_result(query_result)
+        column_info, values = _columnar.decode(query_result, arrays=True)
+        columns = [(name, None, None, None, None, None, None, type_)
+                   for name, type_ in column_info]
+        if values and values[0]:
+            for i, converter in self._converter_plan(columns):
+                values[i] = [None if value is None else converter(value)
+                             for value in values[i]]
+        return self._strip_column_names(columns), _ColumnRows(values)
+
+    def _parse_lazy_result(self, query_result):
+        column_info, lazy_columns = _columnar.decode_lazy(query_result)
+        columns = [(name, None, None, None, None, None, None, type_)
+                   for name, type_ in column_info]
+        nrows = len(lazy_columns[0]) if lazy_columns else 0
+        if nrows:
+            for i, converter in self._converter_plan(columns):
+                lazy_columns[i].converter = converter
+        columns = self._strip_column_names(columns)
+        index = _ColumnIndex(column[0] for column in columns)
+        return columns, _LazyRows(lazy_columns, index, nrows)
+
+    def _strip_column_names(self, columns):
+        if not self._connection.parse_colnames:
+            return columns
+        return [(_column_stripper(column[0], True),) + column[1:] for column in columns]
+
+    def _converter_plan(self, description):
+        """Return the ``(index, converter)`` pairs to apply to a result with
+        these columns.  Plans are built once per statement and column
+        signature and cached on the connection."""
+        connection = self._connection
+        key = (self._operation, tuple((column[0], column[7]) for column in description),
+               connection.detect_types, connection.result_format, converters.version)
+        with connection._lock:
+            plans = connection._converter_plans
+            plan = plans.pop(key, None)
+            if plan is None:
+                plan = self._build_converter_plan(description)
+                while plans and len(plans) >= connection.cached_statements:
+                    plans.popitem(last=False)
+            plans[key] = plan
+        return plan
+
+    def _build_converter_plan(self, description):
+        connection = self._connection
+        if not connection.detect_types:
+            return [(i, extensions._format_time)
+                    for i, column in enumerate(description) if column[7] == "TIME"]
+        typed = connection.result_format == RESULT_FORMAT_COLUMNAR
+        plan = []
+        for i, column in enumerate(description):
+            converter = _convert_to_python(
+                column[0], column[7] or '', connection.parse_decltypes,
+                connection.parse_colnames, typed=typed)
+            # Columns left as they are cost nothing.
+            if converter is not None:
+                plan.append((i, converter))
+        return plan
+
+    def execute(self, operation, parameters=None, timeout=None):
+        """Run ``operation``; ``timeout`` limits it to that many seconds
+        instead of the connection's timeout.  On a streaming cursor the
+        limit applies to each chunk fetched, not to the stream as a whole."""
+        self._close_stream()
         self.rownumber = 0
-        # Step 1: 替换参数并编码为字节
-        operation = self._substitute_params(operation, parameters)
-        query = operation.encode()  # 转换为字节类型
-        print(f"Executing query: {query}")
+        self._chunk_start = 0
+        # Only the dqlite_exec path reports a row id; every other path
+        # leaves it unset rather than stale.
+        self.lastrowid = None
+        is_write = operation.lstrip().upper().startswith(_dml_commands)
+        # Step 1: 绑定参数并编码为字节
+        query, values = self._bind_operation(operation, parameters)
+        if _logger.isEnabledFor(logging.DEBUG):
+            _logger.debug('execute: %s %r', query, values)
+
+        if timeout is not None:
+            self._connection._check_timeout(timeout)
+        if self._streaming and not is_write:
+            self._operation = operation
+            return self._execute_streaming(query, values, timeout)
 
         # Step 2: 执行查询，调用 dqlite_query 并检查结果
-        try:
-            query_result = self._connection.libdqlite.dqlite_query(query)
-            print(f"Raw query result: {query_result}")
-        except Exception as e:
-            print(f"Query execution failed: {e}")
-            self._rows = []
-            self.rowcount = 0
+        # Errors propagate once the retry policy gives up; the cursor is
+        # left empty rather than holding the previous result.
+        self._rows = []
+        self.rowcount = -1
+        self.description = None
+        if is_write and self._connection._supports_exec:
+            # The library reports what the write did; there is no result
+            # to parse.
+            self._operation = operation
+            self.rowcount, self.lastrowid = self._connection._retry(
+                self._connection._execute_write, query, values, timeout,
+                idempotent=False)
             return self
-
+        result = self._connection._retry(
+            self._connection._execute_operation, query, values, is_write,
+            timeout, idempotent=not is_write)
+        # The result is parsed exactly once, straight out of the native
+        # buffer, which is freed as soon as the block exits.
+        with result as query_result:
+            return self._load_result(query_result, operation, is_write)
+
+    def _load_result(self, query_result, operation, is_write):
+        """Make the raw result of ``operation`` this cursor's result set."""
+        self._operation = operation
+        parsed_result = self._parse_query_result(query_result) \
+            if query_result else None
+        if not is_write:
+            self._connection._track_transaction(operation)
 
         # Step 3: 检查是否是 `UPDATE` 或 `DELETE` 操作
-        if operation.strip().upper().startswith(("UPDATE", "DELETE", "INSERT")):
+        if is_write:
             # 对于修改操作（UPDATE, DELETE, INSERT），只需要返回影响的行数
-            if query_result:
-                query_result_str = query_result.decode()
-                print(f"Decoded query result: {query_result_str}")
+            if parsed_result:
                 # 假设影响的行数可以通过解析结果中的某个值来获得
                 # 例如，解析一个返回的行数（如果有）
-                try:
-                    _, affected_rows = self._parse_query_result(query_result_str)
-                    self.rowcount = len(affected_rows)
-                except Exception as e:
-                    print(f"Failed to parse query result for row count: {e}")
-                    self.rowcount = 0
+                _, affected_rows = parsed_result
+                self.rowcount = len(affected_rows)
             else:
                 self.rowcount = 0
             self._rows = []
@@ -301,32 +489,15 @@ class Cursor(object):
             return self
 
         # Step 3: 解析查询结果
-        if query_result:
-            query_result_str = query_result.decode()
-            print(f"Decoded query result: {query_result_str}")
-
+        if parsed_result:
             # Step 4: 解析行数据
-            try:
-                column_names, self._rows = self._parse_query_result(query_result_str)
-                self.rowcount = len(self._rows)
-                print(f"Parsed rows: {self._rows}")
-            except Exception as e:
-                print(f"Failed to parse query result: {e}")
-                self._rows = []
-                self.rowcount = 0
-                return self
+            columns, self._rows = parsed_result
+            self.rowcount = len(self._rows)
 
             # Step 5: 构造 `description`，从列名生成元数据
-            self.description = [
-                (col_name, None, None, None, None, None, None, None)
-                for col_name in column_names
-            ]
-            print(f"Description (column metadata): {self.description}")
-            
-            
+            self.description = columns
         else:
             # 如果查询没有返回任何结果
-            print("No result or query failed")
             self._rows = []
             self.rowcount = 0
             self.description = None
@@ -355,34 +526,82 @@ class Cursor(object):
         
     #     return self
 
-    def executemany(self, operation, seq_of_parameters=None):
+    def _execute_streaming(self, query, values, timeout=None):
+        if not self._connection._supports_streaming:
+            raise NotSupportedError('libdqlite does not support streaming cursors')
+        self._stream = self._connection._retry(
+            self._connection._open_rows, query, values, timeout)
+        self._stream_timeout = timeout
+        self._rows = []
+        self.rowcount = -1
+        self.description = None
+        self._fetch_chunk()
+        return self
+
+    def _fetch_chunk(self):
+        """Replace the buffered rows with the next chunk of the open stream,
+        so at most ``arraysize`` rows are held in memory at a time."""
+        self._chunk_start = self.rownumber
+        self._rows = []
+        with self._connection._next_rows(self._stream, max(self.arraysize, 1),
+                                         self._stream_timeout) as chunk:
+            if chunk:
+                columns, self._rows = self._parse_query_result(chunk)
+                if self.description is None:
+                    self.description = columns
+        if not self._rows:
+            self._close_stream()
+
+    def executemany(self, operation, seq_of_parameters=None, timeout=None):
         if not isinstance(operation, basestring):
             raise ValueError("argument must be a string, not '{}'".format(type(operation).__name__))
+        if timeout is not None:
+            self._connection._check_timeout(timeout)
 
+        self._close_stream()
+        self.rownumber = 0
+        self._chunk_start = 0
         self._rows = []
         self.rowcount = 0
+        self.lastrowid = None
+        self.description = None
+
+        if self._connection._supports_batch:
+            query = operation.encode()
+            param_sets = (
+                _columnar.encode_params([_adapt_value(value) for _, value
+                                         in self._ordered_params(operation, parameters)])
+                for parameters in seq_of_parameters)
+            self.rowcount = self._connection._execute_batch(
+                query, param_sets, max(self.batchsize, 1), timeout)
+            return self
 
         # 对每组参数执行一次查询
+        is_write = operation.lstrip().upper().startswith(_dml_commands)
+        self._operation = operation
         for parameters in seq_of_parameters:
-            # 替换参数
-            query = self._substitute_params(operation, parameters).encode()  # 转换为字节类型
-            print(f"Executing query: {query}")
-            
+            # 绑定参数
+            query, values = self._bind_operation(operation, parameters)
+            if _logger.isEnabledFor(logging.DEBUG):
+                _logger.debug('executemany: %s %r', query, values)
+
+            if is_write and self._connection._supports_exec:
+                changed, _ = self._connection._execute_write(query, values, timeout)
+                self.rowcount += changed
+                continue
+
             # 执行查询
-            query_result = self._connection.libdqlite.dqlite_query(query)
-            print(query_result)
+            with self._connection._execute_operation(
+                    query, values, is_write, timeout) as query_result:
+                parsed_result = self._parse_query_result(query_result) \
+                    if query_result else None
 
-            if query_result:
+            if parsed_result:
                 # 解析查询结果并追加到 self._rows
-                query_result_str = query_result.decode()
-                print(f"Query result: {query_result_str}")
-                rows = self._parse_query_result(query_result_str)
+                _, rows = parsed_result
                 self._rows.extend(rows)
                 self.rowcount += len(rows)
-            else:
-                print("No result or query failed for this execution.")
 
-        print(f"Total rows affected: {self.rowcount}")
         return self
 
     # def fetchone(self):
@@ -394,27 +613,112 @@ class Cursor(object):
     #     return result
     
     def fetchone(self):
-        print(f"1111111111 刚进来  Fetching row at position {self.rownumber}")
+        if self._rows is None:
+            return None
+        index = self.rownumber - self._chunk_start
+        if index >= len(self._rows) and self._stream is not None:
+            self._fetch_chunk()
+            index = 0
         # 检查是否还有数据行未被读取
-        if self.rownumber < len(self._rows):
-            row = self._rows[self.rownumber]
+        if index < len(self._rows):
+            row = self._rows[index]
+            row_factory = self.row_factory
+            if row_factory is not None:
+                row = row_factory(self, row)
             self.rownumber += 1  # 增加行号
-            print(f"22222 增加了1 Fetching row at position {self.rownumber}")
             return row
-        print(f"3333333  没有增加 Fetching row at position {self.rownumber}")
         return None  # 没有更多行时返回 None
 
     def fetchmany(self, size=None):
-        remaining = self.arraysize if size is None else size
-        remaining = min(remaining, self.rowcount - self.rownumber)
-        return [self.fetchone() for i in range(remaining)]
+        return self._take_rows(self.arraysize if size is None else size)
 
     def fetchall(self):
-        print("Fetching all rows in pydqlite/cursors.py..........")
-        rows = []
-        while self.rownumber < self.rowcount:
-            rows.append(self.fetchone())
-        return rows
+        return self._take_rows()
+
+    def _take_rows(self, limit=None):
+        """Fetch up to ``limit`` rows (all remaining ones if None), slicing
+        each buffered chunk at once rather than row by row."""
+        if self._rows is None:
+            return []
+        taken = []
+        while limit is None or len(taken) < limit:
+            rows = self._rows
+            index = self.rownumber - self._chunk_start
+            end = len(rows) if limit is None else min(len(rows), index + limit - len(taken))
+            if index < end:
+                taken.extend(rows[index:end])
+                self.rownumber += end - index
+            if self._stream is None or end < len(rows):
+                break
+            self._fetch_chunk()
+        row_factory = self.row_factory
+        if row_factory is not None:
+            return [row_factory(self, row) for row in taken]
+        return taken
+
+    def _row_index(self):
+        """Column name to position mapping shared by the Row objects of
+        the current result."""
+        index = self._column_index
+        if index is None or index.description is not self.description:
+            index = _ColumnIndex(column[0] for column in self.description)
+            index.description = self.description
+            self._column_index = index
+        return index
+
+    def fetch_columns(self):
+        """Fetch the remaining rows column by column.
+
+        Returns an OrderedDict mapping each column name to its values: an
+        array.array('q') or array.array('d') for columns holding only
+        integers or only floats, a list otherwise.  Columnar results are
+        sliced column-wise, without building a tuple per row."""
+        if self.description is None or self._rows is None:
+            return OrderedDict()
+        return OrderedDict(zip((column[0] for column in self.description),
+                               self._take_columns()))
+
+    def _take_columns(self, limit=None):
+        """Fetch up to ``limit`` rows (all remaining ones if None) as one
+        compacted column per description entry."""
+        pieces = [[] for _ in self.description]
+        taken = 0
+        while limit is None or taken < limit:
+            rows = self._rows
+            index = self.rownumber - self._chunk_start
+            end = len(rows) if limit is None else min(len(rows), index + limit - taken)
+            if index < end:
+                if isinstance(rows, (_ColumnRows, _LazyRows)):
+                    chunk = [column[index:end] for column in rows.columns]
+                else:
+                    chunk = list(zip(*rows[index:end]))
+                for piece, values in zip(pieces, chunk):
+                    piece.append(values)
+                self.rownumber += end - index
+                taken += end - index
+            if self._stream is None or end < len(rows):
+                break
+            self._fetch_chunk()
+        return [_compact_column(piece) for piece in pieces]
+
+    def fetch_numpy(self):
+        """Fetch the remaining rows as one NumPy array per column, in
+        description order.  Requires numpy.  Like fetch_columns(), this
+        reads the result column by column and ignores row_factory."""
+        if self.description is None or self._rows is None:
+            return []
+        return _numpy.columns_to_arrays(self.description, self._take_columns())
+
+    def iter_numpy(self, batch_rows=STREAMING_ARRAYSIZE):
+        """Like fetch_numpy(), but yield the arrays for at most
+        ``batch_rows`` rows at a time."""
+        if self.description is None or self._rows is None:
+            return
+        while True:
+            columns = self._take_columns(batch_rows)
+            if not columns or not len(columns[0]):
+                return
+            yield _numpy.columns_to_arrays(self.description, columns)
 
     def setinputsizes(self, sizes):
         raise NotImplementedError(self)
@@ -423,11 +727,35 @@ class Cursor(object):
         raise NotImplementedError(self)
 
     def scroll(self, value, mode='relative'):
-        raise NotImplementedError(self)
-
-    def next(self):
-        raise NotImplementedError(self)
+        """Move to row ``value`` counted from the current row, or from the
+        first one when ``mode`` is 'absolute'.  Streaming cursors only
+        move forward, skipping the rows in between."""
+        if mode == 'relative':
+            target = self.rownumber + value
+        elif mode == 'absolute':
+            target = value
+        else:
+            raise ProgrammingError('unknown scroll mode: %r' % (mode,))
+        if self._rows is None:
+            raise ProgrammingError('no result set to scroll')
+        if target < 0:
+            raise IndexError('scroll target out of range: %d' % target)
+        if target < self._chunk_start:
+            raise NotSupportedError('a streaming cursor cannot scroll backwards')
+        while self._stream is not None and target > self._chunk_start + len(self._rows):
+            self.rownumber = self._chunk_start + len(self._rows)
+            self._fetch_chunk()
+        if target > self._chunk_start + len(self._rows):
+            raise IndexError('scroll target out of range: %d' % target)
+        self.rownumber = target
+
+    def __next__(self):
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    next = __next__
 
     def __iter__(self):
-        while self.rownumber < self.rowcount:
-            yield self.fetchone()
+        return self
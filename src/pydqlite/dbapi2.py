@@ -4,6 +4,8 @@ from __future__ import unicode_literals
 import time
 
 from .constants import (
+    RESULT_FORMAT_COLUMNAR,
+    RESULT_FORMAT_JSON,
     UNLIMITED_REDIRECTS,
 )
 
@@ -36,13 +38,15 @@ from .types import (
 )
 
 # Compat with native sqlite module
-from .extensions import converters, adapters, register_converter, register_adapter
-from sqlite3.dbapi2 import PrepareProtocol
+from .extensions import (converters, adapters, register_converter, register_adapter,
+                         PrepareProtocol, set_datetime_cache_size)
+from ._jsonresult import register_json_loads
+from .row import Row
 
 
 paramstyle = "qmark"
 
-threadsafety = 1
+threadsafety = 2
 
 apilevel = "2.0"
 
@@ -1,3 +1,53 @@
-from sqlite3 import (Warning, Error, InterfaceError, DatabaseError, DataError,
-                     OperationalError, IntegrityError, InternalError,
-                     ProgrammingError, NotSupportedError)
+"""
+DB-API 2.0 exception hierarchy.
+
+Defined here rather than borrowed from sqlite3 so that importing the
+driver does not load the stdlib SQLite bindings.
+"""
+
+from __future__ import unicode_literals
+
+import sys
+
+if sys.version_info[0] >= 3:
+    StandardError = Exception
+
+
+class Warning(StandardError):
+    pass
+
+
+class Error(StandardError):
+    pass
+
+
+class InterfaceError(Error):
+    pass
+
+
+class DatabaseError(Error):
+    pass
+
+
+class DataError(DatabaseError):
+    pass
+
+
+class OperationalError(DatabaseError):
+    pass
+
+
+class IntegrityError(DatabaseError):
+    pass
+
+
+class InternalError(DatabaseError):
+    pass
+
+
+class ProgrammingError(DatabaseError):
+    pass
+
+
+class NotSupportedError(DatabaseError):
+    pass
@@ -11,7 +11,6 @@ import codecs
 import datetime
 import functools
 import re
-import sqlite3
 import sys
 
 from .exceptions import InterfaceError
@@ -24,6 +23,12 @@ PARSE_DECLTYPES = 1
 PARSE_COLNAMES = 2
 
 
+class PrepareProtocol(object):
+    """Adaptation protocol used as the second half of adapter keys and
+    passed to __conform__, as sqlite3.PrepareProtocol is for the stdlib
+    module."""
+
+
 def _decoder(conv_func):
     """ The Python sqlite3 interface returns always byte strings.
         This function converts the received value to a regular string before
@@ -61,42 +66,96 @@ else:
 def _adapt_date(val):
     return val.isoformat()
 
+_iso_timestamp_re = re.compile(
+    r'(\d{4})-(\d\d)-(\d\d)'
+    r'(?:[T ](\d\d):(\d\d)(?::(\d\d)(?:\.(\d{1,6}))?)?)?'
+    r'([+-]\d\d:?\d\d)?$')
+
+
+def _fromisoformat_fallback(text):
+    """datetime.fromisoformat for Python < 3.7, which lacks it."""
+    match = _iso_timestamp_re.match(text)
+    if match is None:
+        raise ValueError('Invalid isoformat string: {!r}'.format(text))
+    year, month, day, hour, minute, second, fraction, offset = match.groups()
+    tzinfo = None
+    if offset:
+        digits = offset[1:].replace(':', '')
+        delta = datetime.timedelta(hours=int(digits[:2]), minutes=int(digits[2:]))
+        tzinfo = datetime.timezone(-delta if offset[0] == '-' else delta)
+    return datetime.datetime(int(year), int(month), int(day), int(hour or 0),
+                             int(minute or 0), int(second or 0),
+                             int((fraction or '0').ljust(6, '0')), tzinfo)
+
+
+_fromisoformat = getattr(datetime.datetime, 'fromisoformat', _fromisoformat_fallback)
+
+
+def _parse_iso_timestamp(val):
+    """Parse an ISO-8601 date or timestamp such as dqlite produces, e.g.
+    '2020-01-02T03:04:05.123Z', into a naive datetime (aware when the
+    value carries an offset other than Z)."""
+    if isinstance(val, bytes):
+        val = val.decode('ascii')
+    text = val[:-1] if val.endswith('Z') else val
+    try:
+        return _fromisoformat(text)
+    except ValueError:
+        pass
+    # Before Python 3.11 fromisoformat only takes 3 or 6 fractional digits.
+    head, dot, tail = text.partition('.')
+    if dot:
+        digits = len(tail) - len(tail.lstrip('0123456789'))
+        try:
+            return _fromisoformat(
+                '{}.{:0<6.6}{}'.format(head, tail[:digits], tail[digits:]))
+        except ValueError:
+            pass
+    raise ValueError("Couldn't parse datetime string: {}".format(val))
+
+
+def _format_iso_timestamp(val):
+    """Render an ISO-8601 timestamp as 'YYYY-MM-DD HH:MM:SS'."""
+    dt = _parse_timestamp(val)
+    if dt.tzinfo is None:
+        return dt.isoformat(' ', 'seconds')
+    return dt.strftime('%Y-%m-%d %H:%M:%S')
+
+
+# Replaced by memoizing wrappers while the datetime cache is enabled.
+_parse_timestamp = _parse_iso_timestamp
+_format_timestamp = _format_iso_timestamp
+
+
+def set_datetime_cache_size(maxsize):
+    """Memoize the parsing of up to ``maxsize`` distinct date and timestamp
+    values, which pays off when results repeat the same values; 0 or None
+    disables the cache."""
+    global _parse_timestamp, _format_timestamp
+    if maxsize:
+        _parse_timestamp = functools.lru_cache(maxsize)(_parse_iso_timestamp)
+        _format_timestamp = functools.lru_cache(maxsize)(_format_iso_timestamp)
+    else:
+        _parse_timestamp = _parse_iso_timestamp
+        _format_timestamp = _format_iso_timestamp
+
+
 def _convert_date(val):
-    return datetime.date(*map(int, val.split('T')[0].split("-")))
+    return _parse_timestamp(val).date()
 
 def _convert_timestamp(val):
-    datepart, timepart = val.split("T")
-    ymd = datepart.split("-")
-    year, month, day = map(int, datepart.split("-"))
-    timepart_full = timepart.strip('Z').split(".")
-    hours, minutes, seconds = map(int, timepart_full[0].split(":"))
-    if len(timepart_full) == 2:
-        microseconds = int('{:0<6.6}'.format(timepart_full[1]))
-    else:
-        microseconds = 0
-    val = datetime.datetime(year, month, day, hours, minutes, seconds, microseconds)
-    return val
-
-def XX_convert_timestamp(val):
-    if isinstance(val, str):
-        #val = val.encode('utf-8')
-        val = bytes(val, 'utf-8')
-    print(f"VAL BECOMES: {val} is a: {type(val)}")
-    v2 = bytes(val)
-    print(f"V2 BECOMES: {v2} is a: {type(v2)}")
-    datepart, timepart = v2.decode().split("T")
-    ymd = datepart.split("-")
-    print(f"YMD: {ymd}")
-    year, month, day = map(int, datepart.split("-"))
-    timepart_full = timepart.strip('Z').split(".")
-    print(f"TIMEPART: {timepart_full}")
-    hours, minutes, seconds = map(int, timepart_full[0].split(":"))
-    if len(timepart_full) == 2:
-        microseconds = int('{:0<6.6}'.format(timepart_full[1]))
-    else:
-        microseconds = 0
-    val = datetime.datetime(year, month, day, hours, minutes, seconds, microseconds)
-    return val
+    return _parse_timestamp(val)
+
+def _format_time(val):
+    # Looked up on every call, so converter plans built before a
+    # set_datetime_cache_size() call pick up the new cache.
+    return _format_timestamp(val)
+
+def _convert_datetime_text(val):
+    # Like other non-native converters it is given bytes.
+    if isinstance(val, bytes):
+        val = val.decode('utf-8')
+    return val.replace('T', ' ').rstrip('Z')
 
 
 def _null_wrapper(converter, value):
@@ -116,10 +175,33 @@ adapters = {
     datetime.datetime: _adapt_datetime,
 
 }
-adapters = {(type_, sqlite3.PrepareProtocol): val for type_, val in adapters.items()}
+adapters = {(type_, PrepareProtocol): val for type_, val in adapters.items()}
 _default_adapters = adapters.copy()
 
-converters = {
+class _ConverterRegistry(dict):
+    """dict counting its modifications, so that converter plans cached by
+    connections can tell when a converter was registered or removed."""
+
+    version = 0
+
+    def _modified(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            self.version += 1
+            return method(self, *args, **kwargs)
+        return wrapper
+
+    __setitem__ = _modified(dict.__setitem__)
+    __delitem__ = _modified(dict.__delitem__)
+    clear = _modified(dict.clear)
+    pop = _modified(dict.pop)
+    popitem = _modified(dict.popitem)
+    setdefault = _modified(dict.setdefault)
+    update = _modified(dict.update)
+    del _modified
+
+
+converters = _ConverterRegistry({
     'UNICODE': functools.partial(_null_wrapper, lambda x: x.decode('utf-8')),
     'INTEGER': functools.partial(_null_wrapper, int),
     'BOOL': functools.partial(_null_wrapper, bool),
@@ -128,16 +210,21 @@ converters = {
     'NULL': lambda x: None,
     'BLOB': lambda x: x,
     'DATE': functools.partial(_null_wrapper, _convert_date),
-    'DATETIME': lambda x: x.replace('T', ' ').rstrip('Z'),
+    'DATETIME': _convert_datetime_text,
     'TIME': functools.partial(_null_wrapper, _convert_timestamp),
     'TIMESTAMP': functools.partial(_null_wrapper, _convert_timestamp),
-}
+})
 
 # Non-native converters will be decoded from base64 before fed into converter
 # TODO: 'TIME' is only one passed (datetime/timestamp nopes)
 #_native_converters = ('BOOL', 'FLOAT', 'INTEGER', 'REAL', 'NUMBER', 'NULL', 'DATE', 'DATETIME', 'TIMESTAMP', 'TIME')
 _native_converters = ('BOOL', 'FLOAT', 'INTEGER', 'REAL', 'NUMBER', 'NULL', 'DATE', 'TIME')
 
+# Default converters that only coerce a value to the storage class typed
+# (columnar) results already deliver it in.
+_storage_class_converters = {name: converters[name] for name in
+                             ('INTEGER', 'FLOAT', 'REAL', 'BLOB')}
+
 # SQLite TEXT affinity: https://www.sqlite.org/datatype3.html
 _text_affinity_re = re.compile(r'CHAR|CLOB|TEXT')
 
@@ -147,14 +234,20 @@ def register_converter(type_string, function):
 
 
 def register_adapter(type_, function):
-    adapters[(type_, sqlite3.PrepareProtocol)] = function
+    adapters[(type_, PrepareProtocol)] = function
 
 
-def _convert_to_python(column_name, type_, parse_decltypes=False, parse_colnames=False):
+def _convert_to_python(column_name, type_, parse_decltypes=False, parse_colnames=False,
+                       typed=False):
     """
     Tries to mimic stock sqlite3 module behaviours.
 
     PARSE_COLNAMES have precedence over PARSE_DECLTYPES on _sqlite/cursor.c code
+
+    With ``typed`` the values already have their SQLite storage class, as in
+    columnar results: nothing is base64 decoded, text reaches non-native
+    converters as utf-8 bytes like in sqlite3, and None is returned where
+    the converter would leave values unchanged.
     """
     converter = None
     type_upper = None
@@ -183,6 +276,13 @@ def _convert_to_python(column_name, type_, parse_decltypes=False, parse_colnames
             if type_upper in _native_converters or parse_decltypes:
                 converter = converters[type_upper]
 
+    if typed:
+        if converter is None or converter is _storage_class_converters.get(type_upper):
+            return None
+        if type_upper not in _native_converters:
+            converter = functools.partial(_encode_text_converter, converter)
+        return converter
+
     if converter:
         if type_upper not in _native_converters:
             converter = functools.partial(_decode_base64_converter, converter)
@@ -196,29 +296,33 @@ def _convert_to_python(column_name, type_, parse_decltypes=False, parse_colnames
     return converter
 
 
+def _adapt_value(value):
+    """Adapt a Python value to one of the types SQLite stores natively."""
+    if isinstance(value, basestring):
+        return value
+
+    adapter_key = (type(value), PrepareProtocol)
+    adapter = adapters.get(adapter_key)
+    try:
+        if adapter is None:
+            # Fall back to _default_adapters, so that ObjectAdaptationTests
+            # teardown will correctly restore the default state.
+            adapter = _default_adapters[adapter_key]
+    except KeyError as e:
+        # No adapter registered. Let the object adapt itself via PEP-246.
+        # It has been rejected by the BDFL, but is still implemented
+        # on stdlib sqlite3 module even on Python 3 !!
+        # The protocol is the one exported as dbapi2.PrepareProtocol.
+        if hasattr(value, '__adapt__'):
+            return value.__adapt__(PrepareProtocol)
+        elif hasattr(value, '__conform__'):
+            return value.__conform__(PrepareProtocol)
+        raise InterfaceError(e)
+    return adapter(value)
+
+
 def _adapt_from_python(value):
-    if not isinstance(value, basestring):
-        adapter_key = (type(value), sqlite3.PrepareProtocol)
-        adapter = adapters.get(adapter_key)
-        try:
-            if adapter is None:
-                # Fall back to _default_adapters, so that ObjectAdaptationTests
-                # teardown will correctly restore the default state.
-                adapter = _default_adapters[adapter_key]
-        except KeyError as e:
-            # No adapter registered. Let the object adapt itself via PEP-246.
-            # It has been rejected by the BDFL, but is still implemented
-            # on stdlib sqlite3 module even on Python 3 !!
-            if hasattr(value, '__adapt__'):
-                adapted = value.__adapt__(sqlite3.PrepareProtocol)
-            elif hasattr(value, '__conform__'):
-                adapted = value.__conform__(sqlite3.PrepareProtocol)
-            else:
-                raise InterfaceError(e)
-        else:
-            adapted = adapter(value)
-    else:
-        adapted = value
+    adapted = _adapt_value(value)
 
     # The adapter could had returned a string
     if isinstance(adapted, (bytes, unicode)):
@@ -233,6 +337,11 @@ def _adapt_from_python(value):
 def _column_stripper(column_name, parse_colnames=False):
     return column_name.partition(' ')[0] if parse_colnames else column_name
 
+def _encode_text_converter(converter, value):
+    if isinstance(value, unicode):
+        value = value.encode('utf-8')
+    return converter(value)
+
 def _decode_base64_converter(converter, value):
     if value is not None:
         if not isinstance(value, bytes):
@@ -0,0 +1,71 @@
+"""
+pandas DataFrames from query results.
+
+pandas is optional and only imported when a frame is built.
+"""
+
+from __future__ import unicode_literals
+
+from . import _numpy
+from .cursors import Cursor
+
+
+def _pandas():
+    try:
+        import pandas
+    except ImportError:
+        raise ImportError('read_frame() requires pandas; install pydqlite[pandas]')
+    return pandas
+
+
+def _frame(pandas, description, columns):
+    names = [column[0] for column in description or ()]
+    if not names:
+        return pandas.DataFrame()
+    arrays = _numpy.columns_to_arrays(description, columns)
+    frame = pandas.DataFrame(dict(enumerate(arrays)), copy=False)
+    frame.columns = names
+    return frame
+
+
+def _iter_frames(pandas, cursor, chunksize):
+    try:
+        while True:
+            columns = cursor._take_columns(chunksize)
+            if not columns or not len(columns[0]):
+                return
+            yield _frame(pandas, cursor.description, columns)
+    finally:
+        cursor.close()
+
+
+def read_frame(conn, sql, params=None, chunksize=None):
+    """
+    Run ``sql`` on ``conn`` and return its result as a pandas DataFrame.
+
+    Columns are built straight from the result's columns and typed from
+    their declared types as Cursor.fetch_numpy() does.  With ``chunksize``
+    a generator of DataFrames of at most that many rows is returned
+    instead, and the rows are streamed from the server when the library
+    supports it.
+    """
+    pandas = _pandas()
+    if chunksize is not None and chunksize < 1:
+        raise ValueError('chunksize must be a positive integer')
+    streaming = chunksize is not None and conn._supports_streaming
+    cursor = Cursor(conn, streaming=streaming)
+    if streaming:
+        cursor.arraysize = chunksize
+    try:
+        cursor.execute(sql, params)
+    except BaseException:
+        cursor.close()
+        raise
+    if chunksize is not None:
+        return _iter_frames(pandas, cursor, chunksize)
+    try:
+        if cursor.description is None or cursor._rows is None:
+            return pandas.DataFrame()
+        return _frame(pandas, cursor.description, cursor._take_columns())
+    finally:
+        cursor.close()
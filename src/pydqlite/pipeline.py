@@ -0,0 +1,176 @@
+"""
+Pipelined execution of independent statements on one connection.
+
+A pipeline sends statements without waiting for the results of the ones
+before it, so the round trips of a batch of small queries overlap instead
+of adding up.  Results come back in submission order.
+"""
+
+from __future__ import unicode_literals
+
+import collections
+import concurrent.futures
+import ctypes
+
+from . import _columnar
+from .cursors import Cursor, _dml_commands
+from .exceptions import Error, ProgrammingError
+
+
+class PipelineFuture(concurrent.futures.Future):
+    """Future of one pipelined statement, resolving to a Cursor holding
+    its result.  Asking for the result collects pending results up to and
+    including this one."""
+
+    def __init__(self, pipeline):
+        super(PipelineFuture, self).__init__()
+        self._pipeline = pipeline
+        # Whether anyone looked at the outcome, so errors nobody asked for
+        # can be raised when the pipeline ends.
+        self._retrieved = False
+
+    def _wait(self):
+        self._retrieved = True
+        if not self.done():
+            self._pipeline._collect(self)
+
+    def result(self, timeout=None):
+        self._wait()
+        return super(PipelineFuture, self).result(timeout)
+
+    def exception(self, timeout=None):
+        self._wait()
+        return super(PipelineFuture, self).exception(timeout)
+
+
+class Pipeline(object):
+    """
+    Created by Connection.pipeline() and used as a context manager::
+
+        with connection.pipeline() as pipeline:
+            users = pipeline.submit('SELECT * FROM users WHERE id = ?', (1,))
+            count = pipeline.submit('SELECT count(*) FROM orders')
+        print(users.result().fetchall(), count.result().fetchone())
+
+    The connection is reserved for the thread running the ``with`` block
+    until it exits, by which time every statement has completed.  At most
+    ``max_in_flight`` statements are pending at once; submitting another
+    first waits for the oldest.  Run nothing else on the connection inside
+    the block, and note that pipelined statements are not retried.
+
+    Each statement's error is set on its future; if the block itself did
+    not raise, leaving it raises the first error nobody retrieved.
+
+    Libraries without pipelining support run each statement as it is
+    submitted, with the same results.
+    """
+
+    def __init__(self, connection, max_in_flight=64):
+        if max_in_flight < 1:
+            raise ValueError('max_in_flight must be at least 1')
+        self._connection = connection
+        self.max_in_flight = max_in_flight
+        # (request id, future, cursor, operation, is_write), oldest first.
+        self._pending = collections.deque()
+        self._futures = []
+        self._active = False
+
+    def __enter__(self):
+        self._connection._lock.acquire()
+        self._active = True
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        try:
+            self.flush()
+        finally:
+            self._active = False
+            self._connection._lock.release()
+        if exc_type is None:
+            for future in self._futures:
+                if not future._retrieved:
+                    error = concurrent.futures.Future.exception(future)
+                    if error is not None:
+                        raise error
+
+    def submit(self, operation, parameters=None):
+        """Send ``operation`` and return a PipelineFuture for its result."""
+        if not self._active:
+            raise ProgrammingError('Pipelines can only be used inside a with block.')
+        connection = self._connection
+        connection._check_open()
+        future = PipelineFuture(self)
+        self._futures.append(future)
+        cursor = Cursor(connection)
+
+        if not connection._supports_pipeline:
+            try:
+                future.set_result(cursor.execute(operation, parameters))
+            except Error as e:
+                future.set_exception(e)
+            return future
+
+        is_write = operation.lstrip().upper().startswith(_dml_commands)
+        query, values = cursor._bind_operation(operation, parameters)
+        try:
+            # Before the implicit BEGIN below relies on the session.
+            connection._ensure_session()
+        except Error as e:
+            future.set_exception(e)
+            return future
+        if is_write and connection._isolation_level is not None and \
+                not connection._in_transaction:
+            # The implicit BEGIN cannot run while requests are pending.
+            self.flush()
+            connection._begin()
+        while len(self._pending) >= self.max_in_flight:
+            self._collect_one()
+
+        params = _columnar.encode_params(values or [])
+        request_id = ctypes.c_uint64()
+        try:
+            with connection._native_call(connection.libdqlite.dqlite_submit,
+                                         query, params, len(params),
+                                         ctypes.byref(request_id)):
+                pass
+        except Error as e:
+            future.set_exception(e)
+            if connection._needs_reconnect:
+                self._fail_pending(e)
+            return future
+        self._pending.append((request_id.value, future, cursor, operation, is_write))
+        return future
+
+    def results(self):
+        """Yield the Cursor of every statement submitted so far, in
+        submission order, raising the error of any that failed."""
+        for future in list(self._futures):
+            yield future.result()
+
+    def flush(self):
+        """Wait for every pending statement to complete."""
+        while self._pending:
+            self._collect_one()
+
+    def _collect(self, future):
+        while not future.done() and self._pending:
+            self._collect_one()
+
+    def _collect_one(self):
+        connection = self._connection
+        request_id, future, cursor, operation, is_write = self._pending.popleft()
+        try:
+            with connection._native_call(connection.libdqlite.dqlite_wait,
+                                         request_id) as result:
+                cursor._load_result(result, operation, is_write)
+        except Error as e:
+            future.set_exception(e)
+            if connection._needs_reconnect:
+                # Every other request was pending on the session just lost.
+                self._fail_pending(e)
+            return
+        future.set_result(cursor)
+
+    def _fail_pending(self, error):
+        while self._pending:
+            self._pending.popleft()[1].set_exception(error)
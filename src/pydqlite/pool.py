@@ -0,0 +1,169 @@
+"""
+Thread-safe pool of pydqlite connections.
+
+Opening a Connection loads the native library, opens a dqlite session and
+locates the leader; a pool pays that cost once per pooled connection
+instead of once per request.
+"""
+
+from __future__ import unicode_literals
+
+import collections
+import contextlib
+import functools
+import threading
+import time
+
+from .connections import Connection
+from .exceptions import Error, OperationalError, ProgrammingError
+
+
+class ConnectionPool(object):
+    """
+    Keeps between ``min_size`` and ``max_size`` connections open.
+
+    ``timeout`` bounds how long getconn() waits for a free connection,
+    connections idle for longer than ``max_idle`` seconds are closed while
+    the pool holds more than ``min_size``, and with ``validate`` set every
+    checked out connection is pinged and reconnected if its session died.
+    Remaining keyword arguments are passed to ``connect``.
+    """
+
+    def __init__(self, min_size=1, max_size=10, timeout=30.0, max_idle=600.0,
+                 validate=True, connect=Connection, **connect_kwargs):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError('invalid pool size: min_size={} max_size={}'.format(
+                min_size, max_size))
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.validate = validate
+        self._connect = functools.partial(connect, **connect_kwargs)
+        # (last checkin time, connection); most recently used on the right.
+        self._idle = collections.deque()
+        # Connections open or being opened, whether idle or checked out.
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        try:
+            for _ in range(min_size):
+                self._size += 1
+                self._idle.append((time.monotonic(), self._open()))
+        except Exception:
+            # The caller never gets the pool, so nobody else would close
+            # the connections opened so far.
+            for _, conn in self._idle:
+                self._close_quietly(conn)
+            raise
+
+    def _open(self):
+        try:
+            return self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Error:
+            pass
+
+    def _discard(self, conn):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+        self._close_quietly(conn)
+
+    def _evict_idle(self):
+        """Pop connections idle for too long. Must hold self._cond."""
+        stale = []
+        now = time.monotonic()
+        while (self._idle and self._size > self.min_size and
+               now - self._idle[0][0] > self.max_idle):
+            stale.append(self._idle.popleft()[1])
+            self._size -= 1
+        return stale
+
+    def getconn(self, timeout=None):
+        """Check out a connection, waiting up to ``timeout`` seconds."""
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        conn = None
+        stale = []
+        try:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise ProgrammingError('Cannot operate on a closed pool.')
+                    stale.extend(self._evict_idle())
+                    if self._idle:
+                        conn = self._idle.pop()[1]
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise OperationalError(
+                            'timed out waiting for a pooled connection')
+                    self._cond.wait(remaining)
+        finally:
+            for stale_conn in stale:
+                self._close_quietly(stale_conn)
+
+        if conn is None:
+            return self._open()
+        if self.validate and not conn._ping():
+            try:
+                conn._reconnect()
+            except Exception:
+                self._discard(conn)
+                raise
+        return conn
+
+    def putconn(self, conn, discard=False):
+        """Return a connection obtained from getconn() to the pool.
+
+        A transaction left open by the borrower is rolled back."""
+        if not discard and conn.in_transaction:
+            try:
+                conn.rollback()
+            except Error:
+                discard = True
+        with self._cond:
+            if not (discard or self._closed or conn._closed):
+                self._idle.append((time.monotonic(), conn))
+                self._cond.notify()
+                return
+        self._discard(conn)
+
+    @contextlib.contextmanager
+    def connection(self, timeout=None):
+        """Check out a connection for the duration of a ``with`` block."""
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def close(self):
+        """Close idle connections; busy ones are closed when put back."""
+        with self._cond:
+            self._closed = True
+            idle = [conn for _, conn in self._idle]
+            self._idle.clear()
+            self._cond.notify_all()
+        for conn in idle:
+            self._discard(conn)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
@@ -0,0 +1,62 @@
+"""
+Retry policies for statements interrupted by leader changes or node loss.
+"""
+
+from __future__ import unicode_literals
+
+import random
+
+from .constants import DQLITE_CONN_LOST, DQLITE_NOT_LEADER
+
+
+class RetryPolicy(object):
+    """
+    Decides whether, and after how long, a failed statement is retried.
+
+    A statement gets at most ``max_attempts`` tries and no retry is started
+    once ``deadline`` seconds have passed since the first one (None for no
+    deadline).  Delays grow exponentially from ``base_delay`` up to
+    ``max_delay``; ``jitter`` is the fraction of each delay that is
+    randomized, so that clients failing together do not retry together.
+
+    Reads are retried on any of ``retry_codes``.  A write is only retried
+    when it certainly was not applied, i.e. the node refused it for not
+    being the leader, unless ``retry_writes`` is set because the caller
+    knows its writes are idempotent.
+    """
+
+    def __init__(self, max_attempts=5, base_delay=0.05, max_delay=1.0,
+                 jitter=0.5, deadline=5.0, retry_writes=False,
+                 retry_codes=(DQLITE_NOT_LEADER, DQLITE_CONN_LOST)):
+        if max_attempts < 1:
+            raise ValueError('max_attempts must be at least 1')
+        if not 0 <= jitter <= 1:
+            raise ValueError('jitter must be between 0 and 1')
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.deadline = deadline
+        self.retry_writes = retry_writes
+        self.retry_codes = frozenset(retry_codes)
+
+    def backoff(self, attempt):
+        """Seconds to wait after failed attempt number ``attempt`` (from 1)."""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay * (1 - self.jitter * random.random())
+
+    def should_retry(self, error, attempt, idempotent, elapsed, delay):
+        """Whether to retry after ``error`` ended attempt number ``attempt``,
+        ``elapsed`` seconds after the first attempt started."""
+        if attempt >= self.max_attempts:
+            return False
+        if self.deadline is not None and elapsed + delay > self.deadline:
+            return False
+        code = getattr(error, 'dqlite_code', None)
+        if code not in self.retry_codes:
+            return False
+        return idempotent or self.retry_writes or code == DQLITE_NOT_LEADER
+
+
+# Fail immediately, as releases before retry policies did.
+NO_RETRY = RetryPolicy(max_attempts=1)
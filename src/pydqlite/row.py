@@ -1,47 +1,136 @@
-
 try:
     # pylint: disable=no-name-in-module
     from collections.abc import Mapping
 except ImportError:
     from collections import Mapping
 
-from collections import OrderedDict
 
+class _ColumnIndex(dict):
+    """Column name to position mapping shared by the rows of a result,
+    the first column winning on duplicate names as in sqlite3.Row.
+    ``names`` holds every column name in order."""
+
+    def __init__(self, names):
+        super(_ColumnIndex, self).__init__()
+        self.names = tuple(names)
+        for i, name in enumerate(self.names):
+            self.setdefault(name, i)
+
+
+class Row(Mapping):
+    """
+    A result row addressable by position and by column name.
 
-class Row(tuple, Mapping):
+    Usable as a row_factory, ``Row(cursor, values)``, in which case every
+    row of a result shares a single name-to-position mapping owned by the
+    cursor; rows themselves only hold that mapping and the value tuple.
+    ``Row(items)`` builds a standalone row from (name, value) pairs.
+    """
 
-    def __new__(cls, items):
-        return tuple.__new__(cls, (item[1] for item in items))
+    __slots__ = ('_index', '_values')
 
-    def __init__(self, items):
-        super(Row, self).__init__()
-        self._dict = OrderedDict(items)
+    def __init__(self, cursor_or_items, values=None):
+        if values is None:
+            items = list(cursor_or_items)
+            self._index = _ColumnIndex(name for name, _ in items)
+            self._values = tuple(value for _, value in items)
+        else:
+            self._index = cursor_or_items._row_index()
+            self._values = tuple(values)
 
     def __getitem__(self, k):
-        try:
-            return self._dict[k]
-        except (KeyError, TypeError):
-            if isinstance(k, (int, slice)):
-                return tuple.__getitem__(self, k)
-            else:
-                raise
+        if isinstance(k, (int, slice)):
+            return self._values[k]
+        return self._values[self._index[k]]
 
     def __iter__(self):
-        return tuple.__iter__(self)
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, value):
+        return value in self._values
 
     def keys(self):
-        for k in self._dict:
-            if not isinstance(k, int):
-                yield k
+        return list(self._index.names)
 
-    def __len__(self):
-        return tuple.__len__(self)
+    def values(self):
+        return list(self._values)
+
+    def items(self):
+        return list(zip(self._index.names, self._values))
+
+    def __eq__(self, other):
+        if isinstance(other, Row):
+            return self._values == other._values and \
+                self._index.names == other._index.names
+        if isinstance(other, tuple):
+            return self._values == other
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        return hash(self._values)
+
+    def __repr__(self):
+        return '<Row {!r}>'.format(dict(self.items()))
 
     def __str__(self):
-        return str(self._dict)
+        return str(dict(self.items()))
 
     def __delitem__(self, k):
         raise NotImplementedError(self)
 
     def pop(self, k):
         raise NotImplementedError(self)
+
+
+class LazyRow(object):
+    """
+    A row of a lazy result: each value is decoded and converted when it
+    is indexed, by position or by column name, and again every time.
+    Compares equal to the tuple of its values.
+    """
+
+    __slots__ = ('_columns', '_i', '_index')
+
+    def __init__(self, columns, i, index):
+        self._columns = columns
+        self._i = i
+        self._index = index
+
+    def __getitem__(self, k):
+        if isinstance(k, int):
+            return self._columns[k].value(self._i)
+        if isinstance(k, slice):
+            return tuple(column.value(self._i) for column in self._columns[k])
+        return self._columns[self._index[k]].value(self._i)
+
+    def __iter__(self):
+        i = self._i
+        return (column.value(i) for column in self._columns)
+
+    def __len__(self):
+        return len(self._columns)
+
+    def keys(self):
+        return list(self._index.names)
+
+    def __eq__(self, other):
+        if isinstance(other, (tuple, LazyRow, Row)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        return '<LazyRow {!r}>'.format(tuple(self))
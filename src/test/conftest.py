@@ -0,0 +1,188 @@
+import collections
+import ctypes
+import itertools
+import json
+import struct
+import threading
+
+import pytest
+
+from pydqlite import _columnar, _native
+from pydqlite.constants import RESULT_FORMAT_COLUMNAR
+
+
+def columnar_str(value):
+    data = value.encode('utf-8')
+    return struct.pack('<I', len(data)) + data
+
+
+def columnar_result(columns, nrows):
+    """Build a columnar result from (name, decltype, encoded column) triples."""
+    out = [_columnar.MAGIC, struct.pack('<IQ', len(columns), nrows)]
+    for name, decltype, _ in columns:
+        out.append(columnar_str(name) + columnar_str(decltype))
+    out.extend(body for _, _, body in columns)
+    return b''.join(out)
+
+
+def integer_column(*values):
+    return struct.pack('<BB', _columnar.ENCODING_INTEGER, 0) + \
+        struct.pack('<{}q'.format(len(values)), *values)
+
+
+class FakeConnection(object):
+    """The parts of a Connection a Cursor reads its results through.
+    Keyword arguments override the class attributes."""
+
+    result_format = RESULT_FORMAT_COLUMNAR
+    detect_types = parse_decltypes = parse_colnames = 0
+    cached_statements = 128
+    row_factory = None
+    _supports_prepare = True
+    _supports_streaming = False
+    _supports_batch = False
+    _supports_exec = False
+
+    def __init__(self, **attributes):
+        self._lock = threading.RLock()
+        self._converter_plans = collections.OrderedDict()
+        for name, value in attributes.items():
+            setattr(self, name, value)
+
+    def _retry(self, func, *args, **kwargs):
+        return func(*args)
+
+    def _track_transaction(self, operation):
+        pass
+
+
+class FakeLibrary(object):
+    """
+    A stand-in for libdqlite, for Connection tests that need no server.
+
+    Every node in ``nodes`` ("host:port") is reachable and reports
+    ``leaders.get(node, node)`` as the leader; ``members``, when set, is
+    the cluster membership it reports.  Statements are recorded, per
+    node, in ``statements``; a statement in ``failures``, keyed by its
+    text or by (node, text), fails with that return code and one in
+    ``results`` returns those (columns, rows) as JSON, or those bytes.
+    Buffers handed out and not yet freed are kept in ``buffers``, and
+    frees of anything else in ``bad_frees``.  Optional entry points are
+    added by setting them on an instance before the connection is
+    opened.
+    """
+
+    def __init__(self, nodes=('localhost:9001',)):
+        self.nodes = set(nodes)
+        self.leaders = {}
+        self.members = None
+        self.statements = []
+        self.failures = {}
+        self.results = {}
+        self.connects = []
+        self._sessions = {}
+        self._handles = itertools.count(1)
+        self.buffers = {}
+        self.bad_frees = []
+
+    def reply(self, out, out_len, data, rc=0):
+        """Hand ``data`` back through an entry point's out pair."""
+        if data:
+            buf = ctypes.create_string_buffer(data, len(data))
+            self.buffers[ctypes.addressof(buf)] = buf
+            out._obj.value = ctypes.addressof(buf)
+            out_len._obj.value = len(data)
+        return rc
+
+    def node(self, handle):
+        return self._sessions[handle]
+
+    def dqlite_connect(self, address, database):
+        address = address.decode()
+        self.connects.append(address)
+        if address not in self.nodes:
+            return None
+        handle = next(self._handles)
+        self._sessions[handle] = address
+        return handle
+
+    def dqlite_disconnect(self, handle):
+        self._sessions.pop(handle, None)
+
+    def dqlite_free(self, buf):
+        if self.buffers.pop(buf.value, None) is None:
+            self.bad_frees.append(buf.value)
+
+    def dqlite_leader(self, handle, out, out_len):
+        node = self.node(handle)
+        return self.reply(out, out_len, self.leaders.get(node, node).encode())
+
+    def dqlite_cluster(self, handle, out, out_len):
+        if self.members is None:
+            return self.reply(out, out_len, b'not supported', 1)
+        return self.reply(out, out_len, json.dumps(self.members).encode())
+
+    def dqlite_query(self, handle, operation, out, out_len):
+        node, operation = self.node(handle), operation.decode()
+        self.statements.append((node, operation))
+        rc = self.failures.get((node, operation)) or self.failures.get(operation)
+        if rc:
+            return self.reply(out, out_len, operation.encode() + b' failed', rc)
+        result = self.results.get(operation)
+        if isinstance(result, bytes):
+            return self.reply(out, out_len, result)
+        if result is not None:
+            columns, rows = result
+            return self.reply(out, out_len, json.dumps({
+                'columns': [{'name': name, 'type': ''} for name in columns],
+                'rows': rows}).encode())
+        return 0
+
+    def executed(self):
+        """The statements run so far, without the nodes they ran on."""
+        return [operation for _, operation in self.statements]
+
+
+@pytest.fixture
+def fake_library(monkeypatch):
+    library = FakeLibrary()
+    monkeypatch.setattr(_native, '_library', library)
+    return library
+
+
+class StatementLibrary(FakeLibrary):
+    """FakeLibrary with server-side prepared statements.  A statement id
+    is only valid on the session that prepared it; ``bound`` records the
+    encoded parameters of every dqlite_query_stmt call and ``finalized``
+    the ids released."""
+
+    def __init__(self, *args, **kwargs):
+        super(StatementLibrary, self).__init__(*args, **kwargs)
+        self.prepared = {}
+        self.bound = []
+        self.finalized = []
+        self._stmt_ids = itertools.count(1)
+
+    def dqlite_prepare(self, handle, operation, stmt_id, out, out_len):
+        stmt = next(self._stmt_ids)
+        self.prepared[stmt] = (handle, operation.decode())
+        stmt_id._obj.value = stmt
+        return 0
+
+    def dqlite_query_stmt(self, handle, stmt, params, size, out, out_len):
+        owner, operation = self.prepared.get(stmt, (None, None))
+        if owner != handle:
+            return self.reply(out, out_len, b'invalid statement id', 1)
+        self.bound.append(params[:size])
+        return self.dqlite_query(handle, operation.encode(), out, out_len)
+
+    def dqlite_finalize(self, handle, stmt):
+        self.finalized.append(stmt)
+        del self.prepared[stmt]
+
+
+@pytest.fixture
+def statement_library(monkeypatch):
+    library = StatementLibrary()
+    monkeypatch.setattr(_native, '_library', library)
+    return library
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+
+import pytest
+
+import pydqlite.dbapi2 as sqlite
+from pydqlite import _native
+from pydqlite.aio import AsyncConnection
+from pydqlite.constants import DQLITE_INTERRUPTED
+
+from conftest import FakeLibrary
+
+
+class BlockingLibrary(FakeLibrary):
+    """FakeLibrary whose 'SLOW' statement blocks until interrupted or
+    ``release`` is set."""
+
+    def __init__(self, *args, **kwargs):
+        super(BlockingLibrary, self).__init__(*args, **kwargs)
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.interrupted = 0
+
+    def dqlite_query(self, handle, operation, out, out_len):
+        if operation == b'SLOW':
+            self.started.set()
+            self.release.wait(5)
+            if self.interrupted:
+                return self.reply(out, out_len, b'interrupted', DQLITE_INTERRUPTED)
+        return super(BlockingLibrary, self).dqlite_query(
+            handle, operation, out, out_len)
+
+    def dqlite_interrupt(self, handle):
+        self.interrupted += 1
+        self.release.set()
+
+
+@pytest.fixture
+def blocking_library(monkeypatch):
+    library = BlockingLibrary()
+    monkeypatch.setattr(_native, '_library', library)
+    return library
+
+
+def test_cancel_interrupts_running_call(blocking_library):
+    async def main():
+        conn = sqlite.connect()
+        task = asyncio.ensure_future(
+            AsyncConnection(conn)._run(conn.execute, 'SLOW'))
+        await asyncio.get_running_loop().run_in_executor(
+            None, blocking_library.started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert blocking_library.interrupted == 1
+
+    asyncio.run(main())
+
+
+def test_cancel_queued_call_leaves_running_one(blocking_library):
+    async def main():
+        conn = sqlite.connect()
+        aconn = AsyncConnection(conn)
+        ran = []
+        running = asyncio.ensure_future(aconn._run(conn.execute, 'SLOW'))
+        await asyncio.get_running_loop().run_in_executor(
+            None, blocking_library.started.wait, 5)
+        queued = asyncio.ensure_future(aconn._run(ran.append, 'queued'))
+        await asyncio.sleep(0.05)
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        assert blocking_library.interrupted == 0
+        blocking_library.release.set()
+        await running
+        assert blocking_library.executed() == ['SLOW']
+        # The cancelled call never runs once it gets the lock.
+        await aconn._run(lambda: None)
+        assert ran == []
+
+    asyncio.run(main())
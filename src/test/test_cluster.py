@@ -0,0 +1,104 @@
+import pytest
+
+import pydqlite.dbapi2 as sqlite
+from pydqlite.constants import DQLITE_CONN_LOST, DQLITE_NOT_LEADER
+from pydqlite.retry import NO_RETRY, RetryPolicy
+
+NODES = ['localhost:9001', 'localhost:9002', 'localhost:9003']
+
+
+def test_follows_leader_hint(fake_library):
+    fake_library.nodes.update(NODES)
+    fake_library.leaders['localhost:9001'] = 'localhost:9002'
+    conn = sqlite.connect()
+    assert (conn.host, conn.port) == ('localhost', 9002)
+    conn.execute('SELECT 1')
+    assert fake_library.connects == ['localhost:9001', 'localhost:9002']
+    assert fake_library.statements == [('localhost:9002', 'SELECT 1')]
+    # The node that redirected us is no longer connected.
+    assert list(fake_library._sessions.values()) == ['localhost:9002']
+
+
+def test_max_redirects(fake_library):
+    fake_library.nodes.update(NODES)
+    fake_library.leaders.update({'localhost:9001': 'localhost:9002',
+                                 'localhost:9002': 'localhost:9003'})
+    conn = sqlite.connect(max_redirects=1)
+    assert conn.port == 9002
+    assert fake_library.connects == ['localhost:9001', 'localhost:9002']
+
+    conn = sqlite.connect()
+    assert conn.port == 9003
+
+
+def test_falls_back_to_next_node(fake_library):
+    fake_library.nodes = {'localhost:9002'}
+    conn = sqlite.connect(nodes=NODES[:2])
+    assert conn.port == 9002
+    assert fake_library.connects == ['localhost:9001', 'localhost:9002']
+
+    fake_library.nodes = set()
+    with pytest.raises(sqlite.OperationalError) as excinfo:
+        sqlite.connect(nodes=NODES)
+    assert excinfo.value.dqlite_code == DQLITE_CONN_LOST
+
+
+def test_refreshes_nodes_from_cluster(fake_library):
+    fake_library.members = NODES[1:]
+    conn = sqlite.connect()
+    assert conn.nodes == [('localhost', 9002), ('localhost', 9003), ('localhost', 9001)]
+
+
+def test_reconnects_after_not_leader(fake_library):
+    fake_library.nodes.update(NODES)
+    conn = sqlite.connect(retry_policy=RetryPolicy(base_delay=0, jitter=0))
+    # Leadership moves to 9002 after the session was opened.
+    fake_library.leaders['localhost:9001'] = 'localhost:9002'
+    fake_library.failures[('localhost:9001', 'SELECT 1')] = DQLITE_NOT_LEADER
+    conn.execute('SELECT 1')
+    assert fake_library.statements == [('localhost:9001', 'SELECT 1'),
+                                       ('localhost:9002', 'SELECT 1')]
+    assert conn.port == 9002 and not conn._needs_reconnect
+
+
+def test_redirect_loop_fails(fake_library):
+    fake_library.nodes.update(NODES[:2])
+    fake_library.leaders.update({'localhost:9001': 'localhost:9002',
+                                 'localhost:9002': 'localhost:9001'})
+    with pytest.raises(sqlite.OperationalError) as excinfo:
+        sqlite.connect()
+    assert 'redirect loop' in str(excinfo.value)
+    assert fake_library.connects == ['localhost:9001', 'localhost:9002']
+    assert not fake_library._sessions
+
+
+def test_session_lost_inside_transaction(fake_library):
+    conn = sqlite.connect()
+    conn.execute("INSERT INTO t VALUES (1)")
+    fake_library.failures["INSERT INTO t VALUES (2)"] = DQLITE_CONN_LOST
+    with pytest.raises(sqlite.OperationalError):
+        conn.execute("INSERT INTO t VALUES (2)")
+    # Nothing runs outside the lost transaction until it is rolled back.
+    for operation in ("INSERT INTO t VALUES (3)", "SELECT 1"):
+        with pytest.raises(sqlite.OperationalError):
+            conn.execute(operation)
+    with pytest.raises(sqlite.OperationalError):
+        conn.commit()
+    conn.rollback()
+    assert not conn.in_transaction
+    conn.execute("INSERT INTO t VALUES (3)")
+    assert conn.in_transaction
+    assert fake_library.executed() == [
+        'BEGIN', 'INSERT INTO t VALUES (1)', 'INSERT INTO t VALUES (2)',
+        'BEGIN', 'INSERT INTO t VALUES (3)']
+
+
+def test_reconnect_drops_prepared_statements(statement_library):
+    conn = sqlite.connect(isolation_level=None, retry_policy=NO_RETRY)
+    conn.execute('SELECT ?', (1,))
+    statement_library.failures['SELECT 2'] = DQLITE_CONN_LOST
+    with pytest.raises(sqlite.OperationalError):
+        conn.execute('SELECT 2')
+    conn.execute('SELECT ?', (1,))
+    assert statement_library.executed() == ['SELECT ?', 'SELECT 2', 'SELECT ?']
+    assert len(statement_library.connects) == 2
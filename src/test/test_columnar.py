@@ -0,0 +1,203 @@
+import array
+import collections
+import contextlib
+import struct
+
+import pytest
+
+import pydqlite.dbapi2 as sqlite
+from pydqlite import _columnar
+from pydqlite.cursors import Cursor
+
+from conftest import FakeConnection, columnar_result
+
+
+def test_decode_dense_columns():
+    ids = struct.pack('<B', _columnar.ENCODING_INTEGER) + b'\x00' + \
+        struct.pack('<3q', 1, 2, -3)
+    scores = struct.pack('<B', _columnar.ENCODING_FLOAT) + b'\x01' + b'\x02' + \
+        struct.pack('<3d', 0.5, 0.0, 2.5)
+    names = struct.pack('<B', _columnar.ENCODING_TEXT) + b'\x00' + \
+        struct.pack('<3I', 1, 0, 3) + 'a'.encode() + 'hé'.encode()
+    buf = columnar_result([('id', 'INTEGER', ids), ('score', 'REAL', scores),
+                           ('name', 'TEXT', names)], 3)
+
+    info, columns = _columnar.decode(memoryview(buf))
+    assert info == [('id', 'INTEGER'), ('score', 'REAL'), ('name', 'TEXT')]
+    assert columns == [[1, 2, -3], [0.5, None, 2.5], ['a', '', 'hé']]
+
+
+def test_decode_tagged_column():
+    body = struct.pack('<B', _columnar.ENCODING_TAGGED) + \
+        struct.pack('<Bq', _columnar.TAG_INTEGER, 7) + \
+        struct.pack('<B', _columnar.TAG_NULL) + \
+        struct.pack('<BI', _columnar.TAG_BLOB, 2) + b'\x00\xff' + \
+        struct.pack('<Bd', _columnar.TAG_FLOAT, 1.5)
+    info, columns = _columnar.decode(columnar_result([('v', '', body)], 4))
+    assert columns == [[7, None, b'\x00\xff', 1.5]]
+
+
+def test_decode_rejects_bad_magic():
+    with pytest.raises(sqlite.InterfaceError):
+        _columnar.decode(b'JSON' + b'\x00' * 12)
+
+
+def test_encode_params():
+    buf = _columnar.encode_params([None, 1, 2.5, 'hé', b'\x01'])
+    assert buf == struct.pack('<I', 5) + \
+        struct.pack('<B', _columnar.TAG_NULL) + \
+        struct.pack('<Bq', _columnar.TAG_INTEGER, 1) + \
+        struct.pack('<Bd', _columnar.TAG_FLOAT, 2.5) + \
+        struct.pack('<BI', _columnar.TAG_TEXT, 3) + 'hé'.encode('utf-8') + \
+        struct.pack('<BI', _columnar.TAG_BLOB, 1) + b'\x01'
+
+    with pytest.raises(sqlite.InterfaceError):
+        _columnar.encode_params([object()])
+
+
+def test_encode_batch():
+    sets = [_columnar.encode_params([1]), _columnar.encode_params(['a'])]
+    assert _columnar.encode_batch(sets) == struct.pack('<I', 2) + b''.join(sets)
+
+
+def test_fetch_columns():
+    ids = struct.pack('<BB', _columnar.ENCODING_INTEGER, 0) + struct.pack('<3q', 1, 2, 3)
+    scores = struct.pack('<BB', _columnar.ENCODING_FLOAT, 1) + b'\x02' + \
+        struct.pack('<3d', 0.5, 0.0, 2.5)
+    names = struct.pack('<BB', _columnar.ENCODING_TEXT, 0) + \
+        struct.pack('<3I', 1, 1, 1) + b'abc'
+    buf = columnar_result([('id', 'INTEGER', ids), ('score', 'REAL', scores),
+                           ('name', 'TEXT', names)], 3)
+
+    cursor = Cursor(FakeConnection())
+    cursor._load_result(buf, 'SELECT', False)
+    assert cursor.fetchone() == (1, 0.5, 'a')
+    columns = cursor.fetch_columns()
+    assert list(columns) == ['id', 'score', 'name']
+    assert columns['id'] == array.array('q', [2, 3])
+    assert columns['score'] == [None, 2.5]
+    assert columns['name'] == ['b', 'c']
+    assert cursor.fetchone() is None
+
+
+def test_lazy_cursor_decodes_on_access():
+    ids = struct.pack('<BB', _columnar.ENCODING_INTEGER, 1) + b'\x02' + \
+        struct.pack('<3q', 1, 0, 3)
+    names = struct.pack('<BB', _columnar.ENCODING_TEXT, 0) + \
+        struct.pack('<3I', 1, 2, 0) + 'aé'.encode()
+    mixed = struct.pack('<B', _columnar.ENCODING_TAGGED) + \
+        struct.pack('<Bq', _columnar.TAG_INTEGER, 7) + \
+        struct.pack('<BI', _columnar.TAG_TEXT, 1) + b'x' + \
+        struct.pack('<B', _columnar.TAG_NULL)
+    buf = columnar_result([('id', 'INTEGER', ids), ('name', 'TEXT', names),
+                           ('v', '', mixed)], 3)
+
+    cursor = Cursor(FakeConnection(), lazy=True)
+    cursor._load_result(memoryview(buf), 'SELECT', False)
+    assert cursor.rowcount == 3
+    row = cursor.fetchone()
+    assert row['name'] == 'a' and row[0] == 1 and row[-1] == 7
+    assert cursor.fetchone() == (None, 'é', 'x')
+    assert cursor.fetchone() == (3, '', None)
+    assert cursor.fetchone() is None
+
+    cursor = Cursor(FakeConnection(), lazy=True)
+    cursor._load_result(buf, 'SELECT', False)
+    cursor.fetchone()
+    assert cursor.fetch_columns() == collections.OrderedDict(
+        [('id', [None, 3]), ('name', ['é', '']), ('v', ['x', None])])
+
+
+def _int_result(nrows):
+    ids = struct.pack('<BB', _columnar.ENCODING_INTEGER, 0) + \
+        struct.pack('<%dq' % nrows, *range(nrows))
+    return columnar_result([('id', 'INTEGER', ids)], nrows)
+
+
+def test_fetch_slices_and_iteration():
+    cursor = Cursor(FakeConnection())
+    cursor._load_result(_int_result(6), 'SELECT', False)
+    assert cursor.fetchmany(2) == [(0,), (1,)]
+    assert next(cursor) == (2,)
+    assert iter(cursor) is cursor
+    assert cursor.fetchall() == [(3,), (4,), (5,)]
+    assert cursor.fetchmany(2) == [] and cursor.fetchall() == []
+    with pytest.raises(StopIteration):
+        next(cursor)
+
+    cursor = Cursor(FakeConnection())
+    cursor.row_factory = sqlite.Row
+    cursor._load_result(_int_result(3), 'SELECT', False)
+    assert [row['id'] for row in cursor.fetchall()] == [0, 1, 2]
+
+
+def test_scroll():
+    cursor = Cursor(FakeConnection())
+    cursor._load_result(_int_result(5), 'SELECT', False)
+    cursor.scroll(3)
+    assert cursor.fetchone() == (3,)
+    cursor.scroll(-3)
+    assert cursor.fetchone() == (1,)
+    cursor.scroll(0, mode='absolute')
+    assert list(cursor) == [(0,), (1,), (2,), (3,), (4,)]
+    cursor.scroll(5, mode='absolute')
+    assert cursor.fetchone() is None
+    for value, mode in ((6, 'absolute'), (-1, 'absolute'), (-6, 'relative')):
+        with pytest.raises(IndexError):
+            cursor.scroll(value, mode)
+    with pytest.raises(sqlite.ProgrammingError):
+        cursor.scroll(0, 'sideways')
+
+
+class StreamingConnection(FakeConnection):
+
+    _supports_streaming = True
+
+    def __init__(self, chunks):
+        super(StreamingConnection, self).__init__()
+        self._chunks = list(chunks)
+        self.timeouts = []
+
+    def _check_timeout(self, timeout):
+        pass
+
+    def _open_rows(self, operation, values, timeout=None):
+        self.timeouts.append(timeout)
+        return 1
+
+    def _next_rows(self, rows_id, max_rows, timeout=None):
+        self.timeouts.append(timeout)
+        return contextlib.nullcontext(self._chunks.pop(0) if self._chunks else b'')
+
+    def _close_rows(self, rows_id):
+        pass
+
+
+def test_streaming_fetch_and_scroll():
+    def stream(cursor):
+        cursor._stream = 1
+        cursor._rows = []
+        cursor._fetch_chunk()
+        return cursor
+
+    chunks = [_int_result(3), _int_result(3), _int_result(2)]
+    cursor = stream(Cursor(StreamingConnection(chunks), streaming=True))
+    assert cursor.fetchmany(4) == [(0,), (1,), (2,), (0,)]
+    assert cursor.fetchall() == [(1,), (2,), (0,), (1,)]
+
+    chunks = [_int_result(3), _int_result(3), _int_result(2)]
+    cursor = stream(Cursor(StreamingConnection(chunks), streaming=True))
+    cursor.scroll(4)
+    assert cursor.fetchone() == (1,)
+    with pytest.raises(sqlite.NotSupportedError):
+        cursor.scroll(-3)
+    with pytest.raises(IndexError):
+        cursor.scroll(10)
+
+
+def test_streaming_timeout_applies_to_every_chunk():
+    connection = StreamingConnection([_int_result(2), _int_result(2)])
+    cursor = Cursor(connection, streaming=True)
+    cursor.execute('SELECT v FROM t', timeout=0.5)
+    assert len(cursor.fetchall()) == 4
+    assert connection.timeouts == [0.5, 0.5, 0.5, 0.5]
@@ -0,0 +1,44 @@
+import pytest
+
+import pydqlite.dbapi2 as sqlite
+from pydqlite.constants import DQLITE_ERROR
+
+
+def test_connections_own_separate_sessions(fake_library):
+    first, second = sqlite.connect(), sqlite.connect()
+    assert first._handle != second._handle
+    assert sorted(fake_library._sessions) == sorted([first._handle, second._handle])
+    first.close()
+    # Closing one connection leaves the other's session open and usable.
+    assert list(fake_library._sessions) == [second._handle]
+    second.execute('SELECT 1')
+    second.close()
+    assert not fake_library._sessions
+
+
+def test_result_buffers_freed_once(fake_library):
+    fake_library.results.update({
+        'SELECT 1': (['v'], [[1]]),
+        'SELECT bad': b'{"columns": [',
+    })
+    fake_library.failures['SELECT error'] = DQLITE_ERROR
+    conn = sqlite.connect()
+    assert conn.execute('SELECT 1').fetchall() == [(1,)]
+    with pytest.raises(sqlite.InterfaceError):
+        conn.execute('SELECT bad')
+    with pytest.raises(sqlite.OperationalError):
+        conn.execute('SELECT error')
+    assert conn.query(b'SELECT 1')
+    conn.execute('SELECT empty')
+    assert not fake_library.buffers and not fake_library.bad_frees
+
+
+def test_zero_timeout_means_no_limit(fake_library):
+    timeouts = []
+    fake_library.dqlite_set_timeout = \
+        lambda handle, milliseconds: timeouts.append(milliseconds) or 0
+    conn = sqlite.connect(timeout=0)
+    conn.execute('SELECT 1')
+    conn.execute('SELECT 1', timeout=0.0001)
+    conn.execute('SELECT 1', timeout=2)
+    assert timeouts == [0, 1, 2000]
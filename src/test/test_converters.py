@@ -0,0 +1,154 @@
+import datetime
+import struct
+
+import pytest
+
+import pydqlite.dbapi2 as sqlite
+from pydqlite import _columnar
+from pydqlite.cursors import Cursor
+
+from conftest import FakeConnection, columnar_result, integer_column
+
+
+def _connection(detect_types=0):
+    return FakeConnection(detect_types=detect_types,
+                          parse_decltypes=detect_types & sqlite.PARSE_DECLTYPES,
+                          parse_colnames=detect_types & sqlite.PARSE_COLNAMES)
+
+
+def _parse(cursor, buf):
+    cursor._operation = 'SELECT'
+    columns, rows = cursor._parse_query_result(buf)
+    return columns, list(rows)
+
+
+def test_decltype_converters_applied_per_column():
+    buf = columnar_result([('n', 'INTEGER', integer_column(1, 2)), ('f', 'FOO', integer_column(3, 4))], 2)
+    cursor = Cursor(_connection(sqlite.PARSE_DECLTYPES))
+    sqlite.register_converter('FOO', lambda x: -x)
+    try:
+        _, rows = _parse(cursor, buf)
+        assert rows == [(1, -3), (2, -4)]
+        # INTEGER values are already integers: only FOO is in the plan.
+        assert [i for i, _ in cursor._converter_plan(
+            [('n', None, None, None, None, None, None, 'INTEGER'),
+             ('f', None, None, None, None, None, None, 'FOO')])] == [1]
+    finally:
+        del sqlite.converters['FOO']
+    # Removing the converter invalidates the cached plan.
+    _, rows = _parse(cursor, buf)
+    assert rows == [(1, 3), (2, 4)]
+
+
+def test_colname_converters_and_stripped_names():
+    buf = columnar_result([('x [FOO]', '', integer_column(5))], 1)
+    cursor = Cursor(_connection(sqlite.PARSE_COLNAMES))
+    sqlite.converters['FOO'] = lambda x: x * 2
+    try:
+        columns, rows = _parse(cursor, buf)
+    finally:
+        del sqlite.converters['FOO']
+    assert columns[0][0] == 'x'
+    assert rows == [(10,)]
+
+
+def test_text_reaches_converters_as_bytes():
+    body = struct.pack('<BB', _columnar.ENCODING_TEXT, 0) + struct.pack('<I', 2) + b'ab'
+    cursor = Cursor(_connection(sqlite.PARSE_DECLTYPES))
+    sqlite.converters['FOO'] = lambda x: x.decode('ascii').upper()
+    try:
+        _, rows = _parse(cursor, columnar_result([('t', 'FOO', body)], 1))
+    finally:
+        del sqlite.converters['FOO']
+    assert rows == [('AB',)]
+
+
+def test_no_detect_types_leaves_values():
+    buf = columnar_result([('n', 'FOO', integer_column(7))], 1)
+    sqlite.converters['FOO'] = str
+    try:
+        _, rows = _parse(Cursor(_connection()), buf)
+    finally:
+        del sqlite.converters['FOO']
+    assert rows == [(7,)]
+
+
+def test_iso_timestamps():
+    from pydqlite.extensions import _convert_date, _convert_timestamp
+    assert _convert_timestamp('2020-01-02T03:04:05Z') == \
+        datetime.datetime(2020, 1, 2, 3, 4, 5)
+    assert _convert_timestamp(b'2020-01-02T03:04:05.1234567Z') == \
+        datetime.datetime(2020, 1, 2, 3, 4, 5, 123456)
+    assert _convert_timestamp('2020-01-02 03:04:05') == \
+        datetime.datetime(2020, 1, 2, 3, 4, 5)
+    assert _convert_date('2020-01-02T00:00:00Z') == datetime.date(2020, 1, 2)
+    assert Cursor(_connection()).process_datetime('2020-01-02T03:04:05.5Z') == \
+        '2020-01-02 03:04:05'
+    with pytest.raises(ValueError):
+        _convert_timestamp('yesterday')
+
+
+def test_datetime_cache():
+    from pydqlite import extensions
+    sqlite.set_datetime_cache_size(16)
+    try:
+        first = extensions._convert_timestamp('2020-01-02T03:04:05Z')
+        assert extensions._convert_timestamp('2020-01-02T03:04:05Z') is first
+        assert extensions._parse_timestamp.cache_info().hits == 1
+    finally:
+        sqlite.set_datetime_cache_size(0)
+    assert not hasattr(extensions._parse_timestamp, 'cache_info')
+
+
+def test_datetime_decltype_on_typed_text():
+    body = struct.pack('<BB', _columnar.ENCODING_TEXT, 0) + \
+        struct.pack('<I', 20) + b'2020-01-02T03:04:05Z'
+    cursor = Cursor(_connection(sqlite.PARSE_DECLTYPES))
+    _, rows = _parse(cursor, columnar_result([('at', 'DATETIME', body)], 1))
+    assert rows == [('2020-01-02 03:04:05',)]
+
+
+def test_colnames_without_converter_leave_blobs():
+    body = struct.pack('<BB', _columnar.ENCODING_BLOB, 0) + \
+        struct.pack('<I', 2) + b'\x00\x01'
+    cursor = Cursor(_connection(sqlite.PARSE_COLNAMES))
+    _, rows = _parse(cursor, columnar_result([('b', 'BLOB', body)], 1))
+    assert rows == [(b'\x00\x01',)]
+
+
+def test_datetime_cache_applies_to_cached_plans():
+    from pydqlite import extensions
+    body = struct.pack('<BB', _columnar.ENCODING_TEXT, 0) + \
+        struct.pack('<I', 20) + b'2020-01-02T03:04:05Z'
+    buf = columnar_result([('at', 'TIME', body)], 1)
+    cursor = Cursor(_connection())
+    assert _parse(cursor, buf)[1] == [('2020-01-02 03:04:05',)]
+    sqlite.set_datetime_cache_size(16)
+    try:
+        _parse(cursor, buf)
+        _parse(cursor, buf)
+        assert extensions._format_timestamp.cache_info().hits == 1
+    finally:
+        sqlite.set_datetime_cache_size(0)
+
+
+def test_objects_conform_to_pydqlite_protocol():
+    from pydqlite.extensions import _adapt_value
+
+    class Point(object):
+        def __conform__(self, protocol):
+            if protocol is sqlite.PrepareProtocol:
+                return '1;2'
+
+    assert _adapt_value(Point()) == '1;2'
+
+
+def test_fromisoformat_fallback():
+    from pydqlite.extensions import _fromisoformat_fallback as parse
+    assert parse('2020-01-02T03:04:05.5') == datetime.datetime(2020, 1, 2, 3, 4, 5, 500000)
+    assert parse('2020-01-02 03:04') == datetime.datetime(2020, 1, 2, 3, 4)
+    assert parse('2020-01-02') == datetime.datetime(2020, 1, 2)
+    assert parse('2020-01-02T03:04:05-01:30').utcoffset() == \
+        -datetime.timedelta(hours=1, minutes=30)
+    with pytest.raises(ValueError):
+        parse('2020-01-02T03')
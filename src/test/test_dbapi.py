@@ -45,8 +45,8 @@ class ModuleTests(unittest.TestCase):
                          "apilevel is %s, should be 2.0" % sqlite.apilevel)
 
     def test_CheckThreadSafety(self):
-        self.assertEqual(sqlite.threadsafety, 1,
-                         "threadsafety is %d, should be 1" % sqlite.threadsafety)
+        self.assertEqual(sqlite.threadsafety, 2,
+                         "threadsafety is %d, should be 2" % sqlite.threadsafety)
 
     def test_CheckParamStyle(self):
         self.assertEqual(sqlite.paramstyle, "qmark",
@@ -150,6 +150,23 @@ class ConnectionTests(unittest.TestCase):
         #self.cx.close()
         pass
 
+    def test_CheckInterruptWhenIdle(self):
+        if not hasattr(self.cx.libdqlite, 'dqlite_interrupt'):
+            self.skipTest('libdqlite does not support interrupt()')
+        # Nothing is running, so nothing is aborted.
+        self.cx.interrupt()
+        self.cx.execute("select name from test")
+
+    def test_CheckStatementTimeout(self):
+        if not self.cx._supports_timeout:
+            self.skipTest('libdqlite does not support statement timeouts')
+        cu = self.cx.cursor()
+        with self.assertRaises(sqlite.OperationalError):
+            cu.execute("with recursive r(x) as (select 1 union all select x + 1 from r) "
+                       "select count(*) from r", timeout=0.05)
+        cu.execute("select name from test", timeout=5)
+        self.assertEqual(cu.fetchone()[0], "foo")
+
     def test_CheckExceptions(self):
         # Optional DB-API extension.
         self.assertEqual(self.cx.Warning, sqlite.Warning)
@@ -366,6 +383,14 @@ class CursorTests(unittest.TestCase):
         self.cu.executemany("insert into test(name) values (?)", [(1,), (2,), (3,)])
         self.assertEqual(self.cu.rowcount, 3)
 
+    def test_CheckLastRowid(self):
+        self.cu.execute("insert into test(name) values ('foo')")
+        rowid = self.cu.lastrowid
+        self.cu.execute("select id from test where rowid=?", (rowid,))
+        self.assertEqual(self.cu.fetchone()[0], rowid)
+        self.cu.execute("update test set name='bar' where id=?", (rowid,))
+        self.assertEqual(self.cu.rowcount, 1)
+
     @unittest.skip('Cursor.total_changes is not implemented')
     def test_CheckTotalChanges(self):
         self.cu.execute("insert into test(name) values ('foo')")
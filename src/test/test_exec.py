@@ -0,0 +1,59 @@
+import contextlib
+
+from pydqlite.constants import RESULT_FORMAT_JSON
+from pydqlite.cursors import Cursor
+
+from conftest import FakeConnection
+
+
+class ExecConnection(FakeConnection):
+
+    result_format = RESULT_FORMAT_JSON
+    _supports_exec = True
+
+    def __init__(self, **attributes):
+        super(ExecConnection, self).__init__(**attributes)
+        self.writes = []
+
+    def _retry(self, func, *args, **kwargs):
+        if func == self._execute_write:
+            assert kwargs == {'idempotent': False}
+        return func(*args)
+
+    def _execute_write(self, operation, values, timeout=None):
+        self.writes.append((operation, values))
+        return len(values), 40 + len(self.writes)
+
+    def _execute_operation(self, *args):
+        raise AssertionError('writes must not build a result')
+
+
+def test_write_reports_rowcount_and_lastrowid():
+    connection = ExecConnection()
+    cursor = Cursor(connection)
+    cursor.execute('INSERT INTO t VALUES (?, ?)', (1, 'a'))
+    assert (cursor.rowcount, cursor.lastrowid) == (2, 41)
+    assert cursor.description is None and cursor.fetchone() is None
+    assert connection.writes == [(b'INSERT INTO t VALUES (?, ?)', [1, 'a'])]
+
+
+def test_executemany_sums_rowcount():
+    cursor = Cursor(ExecConnection())
+    cursor.executemany('UPDATE t SET v = ?', [(1,), (2,), (3,)])
+    assert cursor.rowcount == 3 and cursor.lastrowid is None
+
+
+def test_lastrowid_reset_by_other_paths():
+    connection = ExecConnection(_supports_batch=True)
+    connection._execute_batch = lambda query, param_sets, size, timeout: \
+        sum(1 for _ in param_sets)
+    connection._execute_operation = \
+        lambda *args: contextlib.nullcontext(b'')
+    cursor = Cursor(connection)
+    cursor.execute('INSERT INTO t VALUES (1)')
+    assert cursor.lastrowid == 41
+    cursor.executemany('INSERT INTO t VALUES (?)', [(2,), (3,)])
+    assert (cursor.rowcount, cursor.lastrowid) == (2, None)
+    cursor.execute('INSERT INTO t VALUES (4)')
+    cursor.execute('SELECT 1')
+    assert cursor.lastrowid is None
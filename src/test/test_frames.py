@@ -0,0 +1,49 @@
+import contextlib
+import struct
+
+import pytest
+
+import pydqlite
+from pydqlite import _columnar
+
+from conftest import FakeConnection, columnar_result
+
+pandas = pytest.importorskip('pandas')
+
+
+RESULT = columnar_result([
+    ('id', 'INTEGER', struct.pack('<BB', _columnar.ENCODING_INTEGER, 0) +
+     struct.pack('<3q', 1, 2, 3)),
+    ('score', 'REAL', struct.pack('<BB', _columnar.ENCODING_FLOAT, 1) + b'\x02' +
+     struct.pack('<3d', 0.5, 0.0, 2.5)),
+    ('name', 'TEXT', struct.pack('<BB', _columnar.ENCODING_TEXT, 0) +
+     struct.pack('<3I', 1, 1, 1) + b'abc'),
+], 3)
+
+
+class FrameConnection(FakeConnection):
+
+    def __init__(self):
+        super(FrameConnection, self).__init__()
+        self.executed = []
+
+    def _execute_operation(self, operation, values, is_write=False, timeout=None):
+        self.executed.append((operation, values))
+        return contextlib.nullcontext(RESULT)
+
+
+def test_read_frame():
+    conn = FrameConnection()
+    frame = pydqlite.read_frame(conn, 'SELECT * FROM t WHERE id > ?', (0,))
+    assert conn.executed == [(b'SELECT * FROM t WHERE id > ?', [0])]
+    assert list(frame.columns) == ['id', 'score', 'name']
+    assert frame['id'].dtype == 'int64'
+    assert frame['score'].dtype == 'float64' and frame['score'].isna().tolist() == \
+        [False, True, False]
+    assert frame['name'].tolist() == ['a', 'b', 'c']
+
+
+def test_read_frame_chunks():
+    frames = list(pydqlite.read_frame(FrameConnection(), 'SELECT * FROM t', chunksize=2))
+    assert [len(frame) for frame in frames] == [2, 1]
+    assert frames[1]['id'].tolist() == [3]
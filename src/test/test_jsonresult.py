@@ -0,0 +1,55 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+import pydqlite.dbapi2 as sqlite
+from pydqlite import _jsonresult
+
+RESULT = json.dumps({
+    'columns': [{'name': 'id', 'type': 'INTEGER'}, {'name': 'at', 'type': 'TIME'}],
+    'rows': [[1, '2020-01-02T03:04:05Z'], [2, None]],
+}).encode()
+
+
+def test_decode_builds_tuples_and_description():
+    description, rows = _jsonresult.decode(memoryview(RESULT))
+    assert [column[0] for column in description] == ['id', 'at']
+    assert description[1][7] == 'TIME'
+    assert rows == [(1, '2020-01-02T03:04:05Z'), (2, None)]
+
+
+def test_decode_applies_plan_to_non_null_values():
+    def plan(description):
+        return [(i, str.lower) for i, column in enumerate(description)
+                if column[7] == 'TIME']
+    _, rows = _jsonresult.decode(RESULT, plan)
+    assert rows == [(1, '2020-01-02t03:04:05z'), (2, None)]
+
+
+def test_register_json_loads():
+    calls = []
+
+    def loads(buf):
+        calls.append(type(buf))
+        return json.loads(buf)
+
+    sqlite.register_json_loads(loads)
+    try:
+        _jsonresult.decode(memoryview(RESULT))
+    finally:
+        sqlite.register_json_loads(None)
+    assert calls == [bytes]
+
+
+def test_decode_rejects_invalid_json():
+    with pytest.raises(sqlite.InterfaceError):
+        _jsonresult.decode(b'{"columns": [')
+
+
+def test_json_library_loaded_on_first_decode():
+    code = ('import sys, pydqlite.dbapi2; from pydqlite import _jsonresult; '
+            'assert "orjson" not in sys.modules and "ujson" not in sys.modules; '
+            '_jsonresult.decode(b"{}"); assert _jsonresult._loads is not None')
+    subprocess.check_call([sys.executable, '-c', code])
@@ -0,0 +1,69 @@
+import array
+import struct
+
+import pytest
+
+from pydqlite import _columnar, _numpy
+from pydqlite.cursors import Cursor
+
+from conftest import FakeConnection, columnar_result, integer_column
+
+numpy = pytest.importorskip('numpy')
+
+DESCRIPTION = [(name, None, None, None, None, None, None, type_) for name, type_ in
+               [('id', 'INTEGER'), ('score', 'REAL'), ('parent', 'INTEGER'),
+                ('at', 'TIMESTAMP'), ('name', 'TEXT'), ('expr', '')]]
+
+ROWS = [(1, 0.5, None, '2020-01-02T03:04:05Z', 'a', 7),
+        (2, None, 1, None, None, 8)]
+
+
+def test_columns_to_arrays_types():
+    ids, scores, parents, at, names, expr = _numpy.columns_to_arrays(
+        DESCRIPTION, [list(column) for column in zip(*ROWS)])
+    assert ids.dtype == numpy.int64 and ids.tolist() == [1, 2]
+    assert scores.dtype == numpy.float64 and numpy.isnan(scores[1])
+    assert parents.dtype == numpy.float64 and parents[1] == 1
+    assert at.dtype == numpy.dtype('datetime64[us]')
+    assert at[0] == numpy.datetime64('2020-01-02T03:04:05')
+    assert numpy.isnat(at[1])
+    assert names.dtype == object and names.tolist() == ['a', None]
+    assert expr.dtype == numpy.int64
+
+
+def test_columns_to_arrays_empty_result():
+    arrays = _numpy.columns_to_arrays(DESCRIPTION, [[] for _ in DESCRIPTION])
+    assert [len(array) for array in arrays] == [0] * len(DESCRIPTION)
+
+
+def test_columns_to_arrays_wraps_arrays():
+    values = array.array('q', [1, 2, 3])
+    ids, = _numpy.columns_to_arrays(DESCRIPTION[:1], [values])
+    values[0] = 9
+    assert ids.tolist() == [9, 2, 3]
+
+
+def _cursor():
+    names = struct.pack('<BB', _columnar.ENCODING_TEXT, 0) + \
+        struct.pack('<3I', 1, 1, 1) + b'abc'
+    cursor = Cursor(FakeConnection())
+    # Column-wise fetches ignore row_factory.
+    cursor.row_factory = lambda cursor, row: dict(zip(('id', 'name'), row))
+    cursor._load_result(columnar_result([('id', 'INTEGER', integer_column(1, 2, 3)),
+                                         ('name', 'TEXT', names)], 3), 'SELECT', False)
+    return cursor
+
+
+def test_cursor_fetch_numpy():
+    cursor = _cursor()
+    cursor.fetchone()
+    ids, names = cursor.fetch_numpy()
+    assert ids.dtype == numpy.int64 and ids.tolist() == [2, 3]
+    assert names.tolist() == ['b', 'c']
+    assert [len(array) for array in cursor.fetch_numpy()] == [0, 0]
+
+
+def test_cursor_iter_numpy():
+    batches = list(_cursor().iter_numpy(batch_rows=2))
+    assert [ids.tolist() for ids, _ in batches] == [[1, 2], [3]]
+    assert [names.tolist() for _, names in batches] == [['a', 'b'], ['c']]
@@ -0,0 +1,84 @@
+import contextlib
+import itertools
+
+import pytest
+
+import pydqlite.dbapi2 as sqlite
+from pydqlite.pipeline import Pipeline
+
+from conftest import (FakeConnection, FakeLibrary, columnar_result,
+                      integer_column)
+
+
+def _int_result(value):
+    return columnar_result([('v', '', integer_column(value))], 1)
+
+
+class PipelineConnection(FakeConnection):
+    """Answers 'SELECT <n>' with n and 'FAIL' with an OperationalError."""
+
+    _supports_pipeline = True
+    _isolation_level = None
+    _in_transaction = False
+    _needs_reconnect = False
+
+    def __init__(self):
+        super(PipelineConnection, self).__init__()
+        # _native_call is faked below; the entry points only need to exist.
+        self.libdqlite = FakeLibrary()
+        self.libdqlite.dqlite_submit = object()
+        self.libdqlite.dqlite_wait = object()
+        self.submitted = {}
+        self.request_ids = itertools.count(1)
+        self.max_pending = 0
+
+    def _check_open(self):
+        pass
+
+    def _ensure_session(self):
+        pass
+
+    def _native_call(self, func, *args):
+        if func == self.libdqlite.dqlite_submit:
+            request_id = next(self.request_ids)
+            self.submitted[request_id] = args[0]
+            args[3]._obj.value = request_id
+            self.max_pending = max(self.max_pending, len(self.submitted))
+            return contextlib.nullcontext(b'')
+        query = self.submitted.pop(args[0])
+        if query == b'FAIL':
+            raise sqlite.OperationalError('no such table: FAIL')
+        return contextlib.nullcontext(_int_result(int(query.split()[1])))
+
+
+def test_pipeline_results_in_order():
+    conn = PipelineConnection()
+    with Pipeline(conn, max_in_flight=4) as pipeline:
+        futures = [pipeline.submit('SELECT {}'.format(i)) for i in range(10)]
+        # Submitting past max_in_flight collected the oldest results.
+        assert futures[5].done() and not futures[6].done()
+        assert futures[7].result().rowcount == 1
+        assert futures[6].done() and not futures[8].done()
+        assert [cursor.fetchone()[0] for cursor in pipeline.results()] == list(range(10))
+    assert conn.max_pending == 4
+    assert not conn.submitted
+
+
+def test_pipeline_raises_unretrieved_error():
+    conn = PipelineConnection()
+    with pytest.raises(sqlite.OperationalError):
+        with Pipeline(conn) as pipeline:
+            pipeline.submit('SELECT 1')
+            pipeline.submit('FAIL')
+    assert not conn.submitted
+
+    with Pipeline(conn) as pipeline:
+        failed = pipeline.submit('FAIL')
+        ok = pipeline.submit('SELECT 2')
+        assert isinstance(failed.exception(), sqlite.OperationalError)
+    assert ok.result().fetchone()[0] == 2
+
+
+def test_pipeline_requires_with_block():
+    with pytest.raises(sqlite.ProgrammingError):
+        Pipeline(PipelineConnection()).submit('SELECT 1')
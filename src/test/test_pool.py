@@ -0,0 +1,79 @@
+import threading
+import time
+
+import pytest
+
+import pydqlite.dbapi2 as sqlite
+from pydqlite.constants import DQLITE_ERROR
+from pydqlite.pool import ConnectionPool
+
+
+@pytest.fixture
+def pool_library(fake_library):
+    # A live session answers the pool's validation ping.
+    fake_library.results['SELECT 1'] = (['1'], [[1]])
+    return fake_library
+
+
+def test_pool_reuses_connections(pool_library):
+    pool = ConnectionPool(min_size=1, max_size=2)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        assert second is first
+    assert len(pool_library.connects) == 1
+    pool.close()
+    assert first._closed
+
+
+def test_pool_checkout_timeout(pool_library):
+    pool = ConnectionPool(min_size=0, max_size=1)
+    conn = pool.getconn()
+    with pytest.raises(sqlite.OperationalError):
+        pool.getconn(timeout=0.01)
+    threading.Timer(0.05, pool.putconn, (conn,)).start()
+    assert pool.getconn(timeout=5) is conn
+
+
+def test_pool_validates_on_checkout(pool_library):
+    pool = ConnectionPool(min_size=1, max_size=1)
+    with pool.connection() as conn:
+        handle = conn._handle
+        pool_library.failures['SELECT 1'] = DQLITE_ERROR
+    with pool.connection() as conn:
+        assert conn._handle != handle
+    assert len(pool_library.connects) == 2
+
+
+def test_pool_evicts_idle(pool_library):
+    pool = ConnectionPool(min_size=0, max_size=2, max_idle=0.01)
+    with pool.connection() as conn:
+        pass
+    time.sleep(0.02)
+    with pool.connection() as other:
+        assert other is not conn
+    assert conn._closed
+
+
+def test_pool_rolls_back_on_checkin(pool_library):
+    pool = ConnectionPool(min_size=1, max_size=1)
+    with pool.connection() as conn:
+        conn.execute('INSERT INTO t VALUES (1)')
+        assert conn.in_transaction
+    assert not conn.in_transaction
+    assert pool_library.executed()[-1] == 'ROLLBACK'
+
+
+def test_pool_closes_opened_connections_if_fill_fails(pool_library):
+    opened = []
+
+    def connect():
+        if len(opened) == 2:
+            raise sqlite.OperationalError('no node reachable')
+        opened.append(sqlite.connect())
+        return opened[-1]
+
+    with pytest.raises(sqlite.OperationalError):
+        ConnectionPool(min_size=3, max_size=3, connect=connect)
+    assert all(conn._closed for conn in opened)
+    assert not pool_library._sessions
@@ -0,0 +1,41 @@
+import pydqlite.dbapi2 as sqlite
+from pydqlite.constants import DQLITE_CONN_LOST, DQLITE_ERROR, DQLITE_NOT_LEADER
+from pydqlite.retry import NO_RETRY, RetryPolicy
+
+
+def _error(code):
+    error = sqlite.OperationalError('failed')
+    error.dqlite_code = code
+    return error
+
+
+def test_backoff_grows_and_is_capped():
+    policy = RetryPolicy(base_delay=0.1, max_delay=0.5, jitter=0)
+    assert [policy.backoff(n) for n in range(1, 5)] == [0.1, 0.2, 0.4, 0.5]
+
+
+def test_backoff_jitter_stays_within_bounds():
+    policy = RetryPolicy(base_delay=0.1, max_delay=0.1, jitter=0.5)
+    for _ in range(100):
+        assert 0.05 <= policy.backoff(3) <= 0.1
+
+
+def test_reads_retry_on_lost_connection():
+    policy = RetryPolicy(max_attempts=3, deadline=None)
+    assert policy.should_retry(_error(DQLITE_CONN_LOST), 1, True, 0, 0)
+    assert not policy.should_retry(_error(DQLITE_CONN_LOST), 3, True, 0, 0)
+    assert not policy.should_retry(_error(DQLITE_ERROR), 1, True, 0, 0)
+
+
+def test_writes_retry_only_when_not_applied():
+    policy = RetryPolicy()
+    assert policy.should_retry(_error(DQLITE_NOT_LEADER), 1, False, 0, 0)
+    assert not policy.should_retry(_error(DQLITE_CONN_LOST), 1, False, 0, 0)
+    assert RetryPolicy(retry_writes=True).should_retry(
+        _error(DQLITE_CONN_LOST), 1, False, 0, 0)
+
+
+def test_deadline_and_no_retry():
+    policy = RetryPolicy(deadline=1.0)
+    assert not policy.should_retry(_error(DQLITE_NOT_LEADER), 1, True, 0.9, 0.2)
+    assert not NO_RETRY.should_retry(_error(DQLITE_NOT_LEADER), 1, True, 0, 0)
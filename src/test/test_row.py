@@ -1,5 +1,7 @@
+from pydqlite.cursors import Cursor
+from pydqlite.row import Row, _ColumnIndex
 
-from pydqlite.row import Row
+from conftest import FakeConnection, columnar_result, integer_column
 
 
 def test_row():
@@ -23,3 +25,41 @@ def test_row():
         pass
     else:
         assert False
+
+
+class FakeCursor(object):
+
+    description = [('id',) + (None,) * 6, ('name',) + (None,) * 6]
+
+    def _row_index(self):
+        try:
+            return self._index
+        except AttributeError:
+            self._index = _ColumnIndex(column[0] for column in self.description)
+            return self._index
+
+
+def test_row_factory_rows_share_index():
+    cursor = FakeCursor()
+    first, second = Row(cursor, (1, 'a')), Row(cursor, (2, 'b'))
+    assert first._index is second._index
+    assert not hasattr(first, '__dict__')
+    assert second['name'] == 'b' and second[0] == 2
+    assert first.keys() == ['id', 'name']
+    assert first == (1, 'a') and first != second
+    assert dict(first.items()) == {'id': 1, 'name': 'a'}
+
+
+def test_cursor_follows_connection_row_factory():
+    result = columnar_result([('id', 'INTEGER', integer_column(1, 2, 3))], 3)
+    conn = FakeConnection()
+    cursor = Cursor(conn)
+    cursor._load_result(result, 'SELECT', False)
+    assert cursor.fetchone() == (1,) and type(cursor.fetchone()) is tuple
+    conn.row_factory = Row
+    assert cursor.fetchone()['id'] == 3
+
+    cursor.row_factory = None
+    cursor._load_result(result, 'SELECT', False)
+    cursor.rownumber = 0
+    assert [type(row) for row in cursor.fetchall()] == [tuple] * 3
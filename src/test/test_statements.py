@@ -0,0 +1,31 @@
+import pydqlite.dbapi2 as sqlite
+from pydqlite import _columnar
+
+
+def test_parameters_are_bound_natively(statement_library):
+    conn = sqlite.connect()
+    conn.execute('SELECT ?, ?', (1, 'a'))
+    conn.execute('SELECT ?, ?', (2, 'b'))
+    assert statement_library.executed() == ['SELECT ?, ?'] * 2
+    assert statement_library.bound == [_columnar.encode_params([1, 'a']),
+                                       _columnar.encode_params([2, 'b'])]
+    # Prepared once, then served from the statement cache.
+    assert list(statement_library.prepared) == [1]
+
+
+def test_cache_evicts_least_recently_used(statement_library):
+    conn = sqlite.connect(cached_statements=2)
+    for operation in ('SELECT 1', 'SELECT 2', 'SELECT 1', 'SELECT 3'):
+        conn.execute(operation)
+    assert statement_library.finalized == [2]
+    assert sorted(operation for _, operation in statement_library.prepared.values()) == \
+        ['SELECT 1', 'SELECT 3']
+
+
+def test_close_finalizes_cached_statements(statement_library):
+    conn = sqlite.connect()
+    conn.execute('SELECT 1')
+    conn.execute('SELECT ?', (1,))
+    conn.close()
+    assert sorted(statement_library.finalized) == [1, 2]
+    assert not statement_library.prepared and not statement_library._sessions
@@ -0,0 +1,113 @@
+import ctypes
+
+import pytest
+
+import pydqlite.dbapi2 as sqlite
+from pydqlite.constants import DQLITE_ERROR
+
+
+def test_failed_batch_keeps_earlier_writes(fake_library):
+    def dqlite_exec_batch(handle, operation, batch, size, changed, out, out_len):
+        return fake_library.reply(out, out_len, b'constraint failed', DQLITE_ERROR)
+
+    fake_library.dqlite_exec_batch = dqlite_exec_batch
+    conn = sqlite.connect()
+    conn.execute("INSERT INTO t VALUES ('kept')")
+    with pytest.raises(sqlite.OperationalError):
+        conn.cursor().executemany('INSERT INTO t VALUES (?)', [(1,), (2,)])
+    assert conn.in_transaction
+    assert fake_library.executed() == [
+        'BEGIN', "INSERT INTO t VALUES ('kept')", 'SAVEPOINT "pydqlite_sp1"',
+        'ROLLBACK TO "pydqlite_sp1"', 'RELEASE "pydqlite_sp1"']
+
+
+def test_batch_under_autocommit_runs_in_own_transaction(fake_library):
+    def dqlite_exec_batch(handle, operation, batch, size, changed, out, out_len):
+        changed._obj.value = 2
+        return 0
+
+    fake_library.dqlite_exec_batch = dqlite_exec_batch
+    conn = sqlite.connect(isolation_level=None)
+    cursor = conn.cursor()
+    cursor.executemany('INSERT INTO t VALUES (?)', [(1,), (2,)])
+    assert cursor.rowcount == 2 and not conn.in_transaction
+    assert fake_library.executed() == ['BEGIN', 'COMMIT']
+
+
+def test_implicit_begin_and_commit(fake_library):
+    conn = sqlite.connect()
+    conn.execute('SELECT 1')
+    assert not conn.in_transaction
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.execute("UPDATE t SET v = 2")
+    assert conn.in_transaction
+    conn.commit()
+    assert not conn.in_transaction
+    conn.commit()
+    assert fake_library.executed() == [
+        'SELECT 1', 'BEGIN', 'INSERT INTO t VALUES (1)', 'UPDATE t SET v = 2', 'COMMIT']
+
+
+def test_isolation_levels(fake_library):
+    conn = sqlite.connect(isolation_level='IMMEDIATE')
+    conn.execute("DELETE FROM t")
+    conn.rollback()
+    assert not conn.in_transaction
+    conn.isolation_level = None
+    conn.execute("DELETE FROM t")
+    assert not conn.in_transaction
+    assert fake_library.executed() == [
+        'BEGIN IMMEDIATE', 'DELETE FROM t', 'ROLLBACK', 'DELETE FROM t']
+    with pytest.raises(ValueError):
+        conn.isolation_level = 'SOMETIMES'
+
+
+def test_context_manager(fake_library):
+    conn = sqlite.connect()
+    with conn:
+        conn.execute("INSERT INTO t VALUES (1)")
+    with pytest.raises(ZeroDivisionError):
+        with conn:
+            conn.execute("INSERT INTO t VALUES (2)")
+            1 / 0
+    assert fake_library.executed() == [
+        'BEGIN', 'INSERT INTO t VALUES (1)', 'COMMIT',
+        'BEGIN', 'INSERT INTO t VALUES (2)', 'ROLLBACK']
+
+
+def test_savepoints(fake_library):
+    conn = sqlite.connect(isolation_level=None)
+    with conn.savepoint() as name:
+        assert conn.in_transaction
+        with pytest.raises(ZeroDivisionError):
+            with conn.savepoint('inner'):
+                1 / 0
+    assert name == 'pydqlite_sp1' and not conn.in_transaction
+    assert fake_library.executed() == [
+        'SAVEPOINT "pydqlite_sp1"', 'SAVEPOINT "inner"', 'ROLLBACK TO "inner"',
+        'RELEASE "inner"', 'RELEASE "pydqlite_sp1"']
+
+    conn = sqlite.connect()
+    with conn.savepoint('sp'):
+        pass
+    # The savepoint ran inside the implicit transaction, which stays open.
+    assert conn.in_transaction
+    assert fake_library.executed()[-3:] == ['BEGIN', 'SAVEPOINT "sp"', 'RELEASE "sp"']
+
+
+def test_transaction_statements_are_tracked(fake_library):
+    conn = sqlite.connect(isolation_level=None)
+    for operation, in_transaction in [('BEGIN', True), ('ROLLBACK TO sp', True),
+                                      ('END', False), ('SAVEPOINT sp', True),
+                                      ('ROLLBACK', False), ('begin', True),
+                                      ('COMMIT', False)]:
+        conn.execute(operation)
+        assert conn.in_transaction is in_transaction, operation
+
+
+def test_close_discards_pending_transaction(fake_library):
+    conn = sqlite.connect()
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.close()
+    assert fake_library.executed() == ['BEGIN', 'INSERT INTO t VALUES (1)']
+    assert not fake_library._sessions